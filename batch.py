@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Batch mode: scrape many URLs across worker threads or processes.
+
+Every worker scrapes with its own browser (checked out of a BrowserPool) and
+a per-domain limit keeps any single site from receiving more than a few
+concurrent scrapes.
+"""
+import math
+import sys
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+from scraper import BrowserPool, WebScraper
+
+_pool = None
+
+
+def read_urls(source):
+    """Read URLs from a file path, or from stdin when source is '-'.
+
+    Blank lines and lines starting with '#' are skipped.
+    """
+    stream = sys.stdin if source == '-' else open(source, encoding='utf-8')
+    try:
+        urls = []
+        for line in stream:
+            url = line.strip()
+            if not url or url.startswith('#'):
+                continue
+            if not url.startswith(('http://', 'https://')):
+                url = 'https://' + url
+            urls.append(url)
+        return urls
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _init_process_worker(show_browser):
+    global _pool
+    import multiprocessing.util
+    _pool = BrowserPool(size=1, show_browser=show_browser)
+    # Worker processes skip atexit handlers, so close the browser via a finalizer
+    multiprocessing.util.Finalize(None, _pool.close, exitpriority=10)
+
+
+def _scrape_one(url, scraper_options):
+    scraper = WebScraper(pool=_pool, **scraper_options)
+    scraper.gui_log = lambda msg: None
+    scraper.verbose = False
+
+    started = time.monotonic()
+    try:
+        scraper.scrape(url)
+        return {
+            'url': url,
+            'ok': True,
+            'elapsed': time.monotonic() - started,
+            'requests': scraper.request_count,
+            'api_endpoints': scraper.endpoint_groups.count,
+            'result_file': scraper.result_file
+        }
+    except Exception as e:
+        return {'url': url, 'ok': False, 'elapsed': time.monotonic() - started, 'error': str(e)}
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def run_batch(urls, workers=4, per_domain=2, show_browser=False, use_processes=False,
+              scraper_options=None, log=print):
+    """Scrape every URL and return a summary with throughput, failures and latency percentiles"""
+    global _pool
+    scraper_options = scraper_options or {}
+
+    queues = OrderedDict()
+    for url in urls:
+        queues.setdefault(urlparse(url).netloc, deque()).append(url)
+
+    if use_processes:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_process_worker,
+                                       initargs=(show_browser,))
+    else:
+        _pool = BrowserPool(size=workers, show_browser=show_browser)
+        executor = ThreadPoolExecutor(max_workers=workers)
+
+    in_flight = {}
+    active = {}
+    results = []
+    started = time.monotonic()
+
+    try:
+        with executor:
+            while queues or in_flight:
+                for domain in list(queues):
+                    while (queues[domain] and len(in_flight) < workers
+                           and active.get(domain, 0) < per_domain):
+                        url = queues[domain].popleft()
+                        in_flight[executor.submit(_scrape_one, url, scraper_options)] = domain
+                        active[domain] = active.get(domain, 0) + 1
+                    if not queues[domain]:
+                        del queues[domain]
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    domain = in_flight.pop(future)
+                    active[domain] -= 1
+                    result = future.result()
+                    results.append(result)
+
+                    if result['ok']:
+                        log(f"[{len(results)}/{len(urls)}] ✅ {result['url']} "
+                            f"({result['elapsed']:.1f}s, {result['api_endpoints']} APIs)")
+                    else:
+                        log(f"[{len(results)}/{len(urls)}] ❌ {result['url']} "
+                            f"({result['elapsed']:.1f}s): {result['error']}")
+    finally:
+        if not use_processes:
+            _pool.close()
+            _pool = None
+
+    elapsed = time.monotonic() - started
+    latencies = [r['elapsed'] for r in results]
+    failures = [r for r in results if not r['ok']]
+
+    return {
+        'total': len(results),
+        'succeeded': len(results) - len(failures),
+        'failed': len(failures),
+        'elapsed_s': round(elapsed, 3),
+        'urls_per_s': round(len(results) / elapsed, 3) if elapsed else 0.0,
+        'latency_p50_s': round(_percentile(latencies, 50), 3),
+        'latency_p95_s': round(_percentile(latencies, 95), 3),
+        'failures': [{'url': r['url'], 'error': r['error']} for r in failures],
+        'results': results
+    }
+
+
+def print_summary(summary):
+    print(f"\n{'='*80}")
+    print(f"📊 BATCH SUMMARY")
+    print(f"{'='*80}\n")
+    print(f"🌐 URLs Scraped: {summary['total']}")
+    print(f"✅ Succeeded: {summary['succeeded']}")
+    print(f"❌ Failed: {summary['failed']}")
+    print(f"⏱️  Total Time: {summary['elapsed_s']:.1f}s")
+    print(f"⚡ Throughput: {summary['urls_per_s']:.2f} URLs/s")
+    print(f"📈 Latency p50: {summary['latency_p50_s']:.2f}s  p95: {summary['latency_p95_s']:.2f}s")
+
+    if summary['failures']:
+        print(f"\n⚠️  Failures:")
+        for failure in summary['failures'][:20]:
+            print(f"   • {failure['url']}: {failure['error']}")
+        if len(summary['failures']) > 20:
+            print(f"   ... and {len(summary['failures']) - 20} more")
+    print()
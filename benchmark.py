@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Benchmark WebScraper.scrape against a local fixture site.
+
+A small HTTP server on 127.0.0.1 serves synthetic pages that fire a given
+number of XHRs with a given body size and HTML size. Each scenario is
+scraped in a headless browser and the per-phase timings (browser launch,
+navigation, wait, capture, analyze, save), Python memory peak and
+requests/sec are reported. Results can be saved and compared run to run:
+
+    python benchmark.py --repeat 3 --output before.json
+    python benchmark.py --repeat 3 --compare before.json
+
+Everything runs offline; only a local Chromium/ChromeDriver is needed.
+
+``--imports`` instead guards cold-start time: scraper.py, run.py and
+scraper_gui.py are imported in fresh interpreters, and the run fails if one
+takes longer than the budget or loads selenium/selenium-wire at import time:
+
+    python benchmark.py --imports --import-budget 250
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from scraper import BrowserPool, WebScraper
+from waits import WAIT_STRATEGIES
+
+SCENARIOS = {
+    'baseline': {'xhr': 5, 'body': 1024, 'html': 20 * 1024},
+    'many-xhr': {'xhr': 200, 'body': 1024, 'html': 20 * 1024},
+    'large-bodies': {'xhr': 10, 'body': 1024 * 1024, 'html': 20 * 1024},
+    'large-html': {'xhr': 5, 'body': 1024, 'html': 2 * 1024 * 1024},
+}
+
+PHASES = ['browser', 'navigate', 'wait', 'page_content', 'capture', 'release', 'analyze', 'save']
+
+# Entry points whose cold import is guarded, and packages they must not load until a browser is needed
+STARTUP_MODULES = ['scraper', 'run', 'scraper_gui']
+HEAVY_MODULES = ['selenium', 'seleniumwire', 'requests']
+DEFAULT_IMPORT_BUDGET_MS = 250
+
+# selenium-wire only sees loopback traffic if Chrome is told not to bypass the proxy for it
+LOOPBACK_ARGS = ('--proxy-bypass-list=<-loopback>',)
+
+
+@lru_cache(maxsize=32)
+def render_page(xhr, body, html):
+    filler_p = "<p>" + "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 8 + "</p>\n"
+    filler = filler_p * max(1, html // len(filler_p))
+    return f"""<!DOCTYPE html>
+<html>
+<head><title>Benchmark fixture: {xhr} XHRs</title></head>
+<body>
+<h1 id="status">loading</h1>
+{filler}
+<script>
+Promise.all(Array.from({{length: {xhr}}}, (_, i) =>
+    fetch('/api/item/' + i + '?body={body}').then(r => r.json())
+)).then(() => {{ document.getElementById('status').textContent = 'done'; }});
+</script>
+</body>
+</html>
+""".encode('utf-8')
+
+
+@lru_cache(maxsize=32)
+def api_body(size):
+    item = "x" * 64
+    count = max(1, size // (len(item) + 3))
+    return json.dumps({'items': [item] * count}).encode('utf-8')
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = {k: int(v[0]) for k, v in parse_qs(parsed.query).items() if v[0].isdigit()}
+
+        if parsed.path == '/page':
+            self._send(200, 'text/html; charset=utf-8', render_page(
+                query.get('xhr', 5), query.get('body', 1024), query.get('html', 20 * 1024)))
+        elif parsed.path.startswith('/api/item/'):
+            self._send(200, 'application/json', api_body(query.get('body', 1024)))
+        else:
+            self._send(404, 'text/plain', b'not found')
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server(port=0):
+    server = ThreadingHTTPServer(('127.0.0.1', port), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_scenario(url, pool, scraper_options):
+    scraper = WebScraper(pool=pool, browser_args=LOOPBACK_ARGS, **scraper_options)
+    scraper.gui_log = lambda msg: None
+
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            scraper.scrape(url, show_browser=False)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    phases = scraper.metrics.phases
+    total = phases['total']
+    return {
+        'timings': {phase: phases.get(phase, 0.0) for phase in PHASES + ['total']},
+        'peak_memory_mb': round(peak / (1024 * 1024), 2),
+        'requests': scraper.request_count,
+        'api_endpoints': scraper.endpoint_groups.count,
+        'requests_per_s': round(scraper.request_count / total, 2) if total else 0.0
+    }
+
+
+def _median_run(runs):
+    """Collapse repeated runs of one scenario into per-metric medians"""
+    return {
+        'timings': {k: round(statistics.median(r['timings'][k] for r in runs), 4) for k in runs[0]['timings']},
+        'peak_memory_mb': round(statistics.median(r['peak_memory_mb'] for r in runs), 2),
+        'requests': runs[-1]['requests'],
+        'api_endpoints': runs[-1]['api_endpoints'],
+        'requests_per_s': round(statistics.median(r['requests_per_s'] for r in runs), 2),
+        'runs': len(runs)
+    }
+
+
+def measure_import(module, repeat=5):
+    """Median import time (ms) of ``module`` in fresh interpreters, plus the heavy packages it loaded"""
+    code = (f"import {module}; import json, sys; "
+            f"print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}} & set({HEAVY_MODULES!r}))))")
+    here = os.path.dirname(os.path.abspath(__file__))
+    import_ms, wall_ms = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True,
+                              text=True, cwd=here)
+        wall_ms.append((time.perf_counter() - started) * 1000)
+        if proc.returncode != 0:
+            return {'error': proc.stderr.strip().splitlines()[-1]}
+        # -X importtime lines are "import time: self | cumulative | name"; the top-level one has no indent
+        for line in proc.stderr.splitlines():
+            fields = line.split('|')
+            if len(fields) == 3 and fields[2].rstrip() == f" {module}":
+                import_ms.append(int(fields[1]) / 1000)
+    return {
+        'import_ms': round(statistics.median(import_ms), 1),
+        'process_ms': round(statistics.median(wall_ms), 1),
+        'heavy_modules': json.loads(proc.stdout.strip().splitlines()[-1])
+    }
+
+
+def check_imports(budget_ms, repeat=5):
+    """Print the cold-start table; returns the results and whether every module is within budget"""
+    results = {module: measure_import(module, repeat) for module in STARTUP_MODULES}
+    print(f"\n{'='*64}")
+    print(f"🧊 COLD IMPORT TIMES (ms, median of {repeat} fresh interpreters, budget {budget_ms:g} ms)")
+    print(f"{'='*64}\n")
+    print(f"{'module':<14}{'import':>9}{'process':>10}  heavy imports")
+    print("-" * 64)
+    ok = True
+    for module, result in results.items():
+        if 'error' in result:
+            print(f"{module:<14}  ❌ {result['error']}")
+            ok = False
+            continue
+        failed = result['import_ms'] > budget_ms or result['heavy_modules']
+        ok = ok and not failed
+        print(f"{module:<14}{result['import_ms']:>9.1f}{result['process_ms']:>10.1f}  "
+              f"{', '.join(result['heavy_modules']) or '-'}{'  ❌' if failed else ''}")
+    print(f"\n{'✅ Startup within budget' if ok else '❌ Startup regression'}\n")
+    return results, ok
+
+
+def print_report(results, previous=None):
+    header = f"{'scenario':<14}" + "".join(f"{p[:8]:>9}" for p in PHASES + ['total']) + f"{'peak MB':>9}{'req/s':>9}"
+    print(f"\n{'='*len(header)}")
+    print(f"⏱️  BENCHMARK RESULTS (seconds, median of runs)")
+    print(f"{'='*len(header)}\n")
+    print(header)
+    print("-" * len(header))
+    for name, result in results.items():
+        row = f"{name:<14}" + "".join(f"{result['timings'][p]:>9.3f}" for p in PHASES + ['total'])
+        print(row + f"{result['peak_memory_mb']:>9.1f}{result['requests_per_s']:>9.1f}")
+
+    if previous:
+        print(f"\n🔀 Change vs previous run:")
+        for name, result in results.items():
+            before = previous.get('results', {}).get(name)
+            if not before:
+                continue
+            deltas = []
+            for label, old, new in [
+                ('total', before['timings']['total'], result['timings']['total']),
+                ('capture', before['timings']['capture'], result['timings']['capture']),
+                ('peak MB', before['peak_memory_mb'], result['peak_memory_mb']),
+                ('req/s', before['requests_per_s'], result['requests_per_s']),
+            ]:
+                pct = (new - old) / old * 100 if old else 0.0
+                deltas.append(f"{label} {pct:+.1f}%")
+            print(f"   • {name}: " + ", ".join(deltas))
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WebScraper against a local fixture site")
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable, default: all)")
+    parser.add_argument('--repeat', type=int, default=1, help="runs per scenario; medians are reported (default: 1)")
+    parser.add_argument('--warm', action='store_true', help="reuse one pooled browser so launch cost is excluded")
+    parser.add_argument('--wait', choices=sorted(WAIT_STRATEGIES), default='network-idle',
+                        help="wait strategy to benchmark (default: network-idle)")
+    parser.add_argument('--output-format', choices=['json', 'ndjson'], default='json')
+    parser.add_argument('--stream', action='store_true', help="benchmark streaming capture instead of batch capture")
+    parser.add_argument('--output', metavar='FILE', help="save results as JSON for later --compare")
+    parser.add_argument('--compare', metavar='FILE', help="show the change against a previous --output file")
+    parser.add_argument('--serve', action='store_true', help="only run the fixture server (for manual testing)")
+    parser.add_argument('--port', type=int, default=0, help="fixture server port (default: any free port)")
+    parser.add_argument('--imports', action='store_true',
+                        help="measure cold import time of the entry points instead; exits 1 over budget")
+    parser.add_argument('--import-budget', type=float, default=DEFAULT_IMPORT_BUDGET_MS, metavar='MS',
+                        help=f"--imports: max import time per module (default: {DEFAULT_IMPORT_BUDGET_MS})")
+    args = parser.parse_args()
+
+    if args.imports:
+        results, ok = check_imports(args.import_budget, repeat=max(args.repeat, 5))
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump({'settings': vars(args), 'imports': results}, f, indent=2)
+            print(f"💾 Saved import timings to {args.output}\n")
+        sys.exit(0 if ok else 1)
+
+    server = start_fixture_server(args.port)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    if args.serve:
+        print(f"🧪 Fixture site running at {base_url}/page?xhr=20&body=1024&html=20480 (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            return
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+
+    scenarios = args.scenario or list(SCENARIOS)
+    scraper_options = {'wait': args.wait, 'output_format': args.output_format, 'stream': args.stream}
+    pool = BrowserPool(size=1, browser_args=LOOPBACK_ARGS) if args.warm else None
+    results = {}
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='scraper-bench-') as workdir:
+        # Scrape output lands in workdir/scrape_results and is thrown away afterwards
+        os.chdir(workdir)
+        try:
+            if pool:
+                run_scenario(f"{base_url}/page?xhr=1", pool, scraper_options)
+            for name in scenarios:
+                spec = SCENARIOS[name]
+                url = f"{base_url}/page?xhr={spec['xhr']}&body={spec['body']}&html={spec['html']}"
+                print(f"🏃 {name}: {spec['xhr']} XHRs, {spec['body']} B bodies, {spec['html']} B HTML "
+                      f"x{args.repeat}", file=sys.stderr)
+                results[name] = _median_run([run_scenario(url, pool, scraper_options) for _ in range(args.repeat)])
+        finally:
+            os.chdir(cwd)
+            if pool:
+                pool.close()
+            server.shutdown()
+
+    print_report(results, previous)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'settings': vars(args), 'results': results}, f, indent=2)
+        print(f"💾 Saved benchmark results to {args.output}\n")
+
+
+if __name__ == "__main__":
+    main()
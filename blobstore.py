@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Content-addressed, compressed storage for response bodies and page HTML.
+
+Blobs are named by the sha256 of their uncompressed content and stored once
+under scrape_results/blobs/{hash[:2]}/{hash}.zst (or .gz when the zstandard
+package isn't installed). Result files reference blobs by hash
+(``body_blob``, ``page_html_blob``), so identical bodies across runs and
+domains are only written and compressed the first time they are seen.
+
+    python blobstore.py cat <hash> > page.html
+    python blobstore.py stats
+"""
+import gzip
+import hashlib
+import io
+import os
+import sys
+import tempfile
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BLOB_DIR = os.path.join('scrape_results', 'blobs')
+EXTENSIONS = ('.zst', '.gz')
+
+
+class BlobStore:
+    def __init__(self, root=BLOB_DIR, codec=None, level=None):
+        self.root = root
+        self.codec = codec or ('zstd' if zstandard else 'gzip')
+        if self.codec == 'zstd' and not zstandard:
+            raise ValueError("zstd blobs need the zstandard package (pip install zstandard)")
+        self.level = level if level is not None else (3 if self.codec == 'zstd' else 6)
+
+    def _path(self, digest, extension):
+        return os.path.join(self.root, digest[:2], digest + extension)
+
+    def path_for(self, digest):
+        """Path of an existing blob in either codec, or None"""
+        for extension in EXTENSIONS:
+            path = self._path(digest, extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _compress(self, data):
+        if self.codec == 'zstd':
+            return zstandard.ZstdCompressor(level=self.level).compress(data)
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def put(self, data):
+        """Store bytes (or text as UTF-8); returns (sha256, bytes written), writing nothing if already stored"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        if self.path_for(digest):
+            return digest, 0
+
+        path = self._path(digest, '.zst' if self.codec == 'zstd' else '.gz')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = self._compress(data)
+        # Write to a temp file and rename so concurrent writers of the same blob never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+        except:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest, len(compressed)
+
+    def open(self, digest):
+        """Open a blob as a binary stream of its uncompressed content"""
+        path = self.path_for(digest)
+        if not path:
+            raise FileNotFoundError(f"blob {digest} not found in {self.root}")
+        if path.endswith('.gz'):
+            return gzip.open(path, 'rb')
+        if not zstandard:
+            raise RuntimeError("reading .zst blobs needs the zstandard package (pip install zstandard)")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True))
+
+    def get(self, digest):
+        with self.open(digest) as f:
+            return f.read()
+
+    def stats(self):
+        count = size = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(EXTENSIONS):
+                    count += 1
+                    size += os.path.getsize(os.path.join(dirpath, name))
+        return {'blobs': count, 'bytes': size}
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == 'cat':
+        with BlobStore().open(sys.argv[2]) as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sys.stdout.buffer.write(chunk)
+    elif len(sys.argv) == 2 and sys.argv[1] == 'stats':
+        stats = BlobStore().stats()
+        print(f"📦 {stats['blobs']} blobs, {stats['bytes'] / (1024 * 1024):.1f} MB in {BLOB_DIR}")
+    else:
+        print("Usage: python blobstore.py cat <hash> | stats")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
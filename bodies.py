@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Lazy handling of captured response bodies.
+
+Bodies stay as the raw bytes selenium-wire captured. Console and GUI previews
+are built from a bounded prefix without parsing the whole body, and bodies
+are only decoded (or parsed as JSON) when something actually needs them.
+"""
+import base64
+import json
+import zlib
+
+
+def response_body(response):
+    """A response's body with any Content-Encoding (gzip, br, zstd...) undone"""
+    body = response.body
+    encoding = response.headers.get('Content-Encoding', 'identity').strip().lower()
+    if not body or encoding in ('', 'identity') or getattr(response, 'already_decoded', False):
+        return body
+    # Imported here so previews and result files can be handled without loading selenium-wire
+    from seleniumwire.utils import decode
+    try:
+        return decode(body, encoding)
+    except ValueError:
+        # Mislabelled or truncated body: keep the bytes as captured
+        return body
+
+
+def response_body_prefix(response, limit):
+    """The first ``limit`` bytes of a response's decoded body, without decoding the rest if avoidable"""
+    body = response.body
+    encoding = response.headers.get('Content-Encoding', 'identity').strip().lower()
+    if not body or encoding in ('', 'identity') or getattr(response, 'already_decoded', False):
+        return body[:limit] if body else body
+    if encoding in ('gzip', 'x-gzip', 'deflate'):
+        # gzip and zlib streams can be cut off after the first bytes; other codings are decoded whole
+        for wbits in ((16 + zlib.MAX_WBITS,) if encoding != 'deflate' else (zlib.MAX_WBITS, -zlib.MAX_WBITS)):
+            try:
+                return zlib.decompressobj(wbits).decompress(body, limit)
+            except zlib.error:
+                continue
+    return response_body(response)[:limit]
+
+
+def looks_like_json(body):
+    """Sniff the first non-whitespace byte instead of parsing the body"""
+    return body[:64].lstrip()[:1] in (b'{', b'[')
+
+
+def _prefix_text(body, limit):
+    # Worst case UTF-8 uses 4 bytes per character; a character cut in half at the end is dropped
+    return body[:limit * 4].decode('utf-8', errors='ignore')
+
+
+def json_preview(body, limit):
+    """Pretty-print (indent=2 style) the start of a JSON body, stopping after ``limit`` characters"""
+    out = []
+    size = 0
+    depth = 0
+    in_string = escaped = False
+    text = _prefix_text(body, limit)
+
+    def emit(s):
+        nonlocal size
+        out.append(s)
+        size += len(s)
+
+    i = 0
+    while i < len(text) and size < limit:
+        ch = text[i]
+        if in_string:
+            emit(ch)
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+            emit(ch)
+        elif ch in '{[':
+            j = i + 1
+            while j < len(text) and text[j] in ' \t\r\n':
+                j += 1
+            if j < len(text) and text[j] == ('}' if ch == '{' else ']'):
+                emit(ch + text[j])
+                i = j
+            else:
+                depth += 1
+                emit(ch + "\n" + "  " * depth)
+        elif ch in '}]':
+            depth = max(0, depth - 1)
+            emit("\n" + "  " * depth + ch)
+        elif ch == ',':
+            emit(",\n" + "  " * depth)
+        elif ch == ':':
+            emit(": ")
+        elif ch not in ' \t\r\n':
+            emit(ch)
+        i += 1
+
+    return ''.join(out)[:limit]
+
+
+def preview_body(body, limit):
+    """Return (preview, is_json) for a body given as bytes (or already-decoded text)"""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    if looks_like_json(body):
+        return json_preview(body, limit), True
+    return _prefix_text(body, limit)[:limit], False
+
+
+def body_text(body):
+    """Decode a full body on demand"""
+    if isinstance(body, str):
+        return body
+    return body.decode('utf-8', errors='replace')
+
+
+def body_json(body):
+    """Parse a full body as JSON on demand"""
+    return json.loads(body)
+
+
+def inline_body(record):
+    """A record's inline body as the original bytes (undoing serializable_body), or None"""
+    body = record.get('body')
+    if body is None or isinstance(body, (bytes, bytearray)):
+        return body
+    if record.get('body_encoding') == 'base64':
+        return base64.b64decode(body)
+    return body.encode('utf-8')
+
+
+def serializable_body(record):
+    """Shallow copy of a record with its body turned into JSON-safe text.
+
+    Valid UTF-8 bodies become strings as before; anything else (protobuf,
+    images) is base64-encoded and marked with body_encoding.
+    """
+    body = record.get('body')
+    if not isinstance(body, (bytes, bytearray)):
+        return record
+    record = dict(record)
+    try:
+        record['body'] = body.decode('utf-8')
+    except UnicodeDecodeError:
+        record['body'] = base64.b64encode(body).decode('ascii')
+        record['body_encoding'] = 'base64'
+    return record
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Cooperative cancellation for scrapes.
+
+A CancelToken is passed to WebScraper.scrape and checked between phases,
+inside the capture loop and while waiting for the page. Cancelling also runs
+the registered callbacks right away, which is how a browser stuck in
+driver.get() gets shut down instead of finishing the page first:
+
+    token = CancelToken()
+    threading.Thread(target=scraper.scrape, args=(url,), kwargs={'cancel': token}).start()
+    ...
+    token.cancel()    # the scrape raises ScrapeCancelled and its browser is closed
+"""
+import threading
+
+
+class ScrapeCancelled(Exception):
+    """Raised inside a scrape once its CancelToken has been cancelled"""
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        """Mark as cancelled and run the registered callbacks (in the calling thread)"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                # Cleanup is best effort; the scrape itself reports the cancellation
+                pass
+
+    def on_cancel(self, callback):
+        """Run ``callback`` on cancel, or now if already cancelled; returns a function that unregisters it"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._unregister(callback)
+        callback()
+        return lambda: None
+
+    def _unregister(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise ScrapeCancelled("Scrape cancelled")
+
+    def sleep(self, seconds):
+        """Sleep, waking up early and raising ScrapeCancelled if cancelled meanwhile"""
+        if self._event.wait(seconds):
+            raise ScrapeCancelled("Scrape cancelled")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Rule-based API endpoint classifier.
+
+Each rule is a precompiled regex on one of:
+
+    content_type  the response Content-Type (lower-cased)
+    url           the request URL
+    sniff         the first bytes of the body; only tried for vague content
+                  types (text/plain, octet-stream, none) so JSON served as
+                  text is still found without reading every body
+
+Rules are tried in order and the first match wins: an include rule's name
+is stored as ``matched_rule`` on the endpoint, an exclude rule means "not an
+API". Rules loaded from a JSON file go before the defaults:
+
+    {
+      "replace_defaults": false,
+      "rules": [
+        {"name": "internal-api", "url": "/internal/"},
+        {"name": "beacons", "url": "/collect\\\\?", "exclude": true},
+        {"name": "xml-api", "sniff": "^<\\\\?xml"}
+      ]
+    }
+"""
+import json
+import re
+
+KINDS = ('content_type', 'url', 'sniff')
+SNIFF_BYTES = 64
+
+# Content types too vague to trust either way, so the body is sniffed instead
+SNIFF_TYPES = re.compile(r'^(?:text/plain|application/octet-stream|binary/octet-stream|)$')
+
+DEFAULT_RULES = [
+    {'name': 'static-asset', 'exclude': True,
+     'url': r'\.(?:m?js|css|png|jpe?g|gif|svg|webp|avif|ico|woff2?|ttf|otf|eot|mp4|webm|mp3|wasm|map)(?:[?#]|$)'},
+    {'name': 'page-or-media', 'exclude': True,
+     'content_type': r'^(?:text/(?:html|css)|(?:application|text)/(?:x-)?(?:java|ecma)script|image/|font/|audio/|video/)'},
+    {'name': 'ndjson', 'content_type': r'application/(?:x-)?(?:ndjson|jsonl|json-seq|jsonlines)'},
+    {'name': 'json', 'content_type': r'application/(?:[\w.-]+\+)?json\b'},
+    {'name': 'grpc-web', 'content_type': r'application/grpc(?:-web)?(?:[+-][\w]+)?\b'},
+    {'name': 'protobuf', 'content_type': r'application/(?:x-|vnd\.google\.)?protobuf|application/x-protobuffer'},
+    {'name': 'msgpack', 'content_type': r'application/(?:x-)?msgpack'},
+    {'name': 'event-stream', 'content_type': r'text/event-stream'},
+    {'name': 'graphql', 'url': r'(?i)graphql'},
+    {'name': 'api-path', 'url': r'/api(?:/|\?|$)'},
+    {'name': 'versioned-path', 'url': r'/v\d+(?:\.\d+)?/'},
+    {'name': 'rpc-path', 'url': r'/(?:rest|rpc|jsonrpc|xmlrpc)(?:/|\?|$)'},
+    {'name': 'json-sniff', 'sniff': r'^(?:\xef\xbb\xbf)?(?:\)\]\}\'\s*)?\s*(?:\{\s*["}]|\[\s*(?:[\[{"\]\d-]|true|false|null))'},
+]
+
+
+class ApiClassifier:
+    def __init__(self, rules=None):
+        self.rules = list(DEFAULT_RULES if rules is None else rules)
+        self.compiled = []
+        for rule in self.rules:
+            kinds = [kind for kind in KINDS if kind in rule]
+            if len(kinds) != 1 or not rule.get('name'):
+                raise ValueError(f"API rule needs a name and exactly one of {', '.join(KINDS)}: {rule}")
+            kind = kinds[0]
+            pattern = rule[kind]
+            try:
+                # Sniff rules match raw bytes; latin-1 maps \xNN escapes in the rule one-to-one onto bytes
+                compiled = re.compile(pattern.encode('latin-1') if kind == 'sniff' else pattern)
+            except (re.error, UnicodeEncodeError) as e:
+                raise ValueError(f"Invalid pattern in API rule '{rule['name']}': {e}")
+            self.compiled.append((kind, compiled, None if rule.get('exclude') else rule['name']))
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+        rules = config.get('rules', []) if isinstance(config, dict) else config
+        replace = isinstance(config, dict) and config.get('replace_defaults')
+        # Loaded rules come first so they win over the defaults
+        return cls(rules if replace else rules + DEFAULT_RULES)
+
+    def classify(self, url, content_type, body_prefix=None):
+        """Return the name of the first matching rule, or None if this isn't an API response.
+
+        body_prefix is a callable returning the first bytes of the decoded body; it is only
+        called when a sniff rule actually needs it.
+        """
+        mime = content_type.split(';', 1)[0].strip()
+        sniffable = body_prefix is not None and SNIFF_TYPES.match(mime)
+        prefix = None
+        for kind, pattern, name in self.compiled:
+            if kind == 'content_type':
+                subject = mime
+            elif kind == 'url':
+                subject = url
+            elif not sniffable:
+                continue
+            else:
+                if prefix is None:
+                    prefix = (body_prefix() or b'')[:SNIFF_BYTES]
+                subject = prefix
+            if pattern.search(subject):
+                return name
+        return None
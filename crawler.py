@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Crawl mode: follow same-origin links found in captured HTML.
+
+Starting from one URL, every scraped page's HTML is parsed for links on the
+same origin. New links go into a prioritized frontier (shallowest first) with
+URL normalization and a seen-set (or a Bloom filter for very large crawls)
+for dedupe. A bounded set of pooled browsers is driven concurrently from
+asyncio, with max depth/pages limits, a per-host concurrency cap, a
+politeness delay between requests to the same host and robots.txt checks.
+"""
+import asyncio
+import hashlib
+import heapq
+import json
+import math
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+from html.parser import HTMLParser
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+from urllib.robotparser import RobotFileParser
+
+from scraper import BrowserPool, WebScraper
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url):
+    """Canonical form used for dedupe: lower-case scheme/host, no default port, no fragment, sorted query"""
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or '').lower()
+    if parsed.port and parsed.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parsed.port}"
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((scheme, host, parsed.path or '/', '', query, ''))
+
+
+def origin_of(url):
+    parsed = urlparse(normalize_url(url))
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+class _LinkParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.base = None
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'base' and attrs.get('href') and self.base is None:
+            self.base = attrs['href']
+        elif tag in ('a', 'area') and attrs.get('href'):
+            self.links.append(attrs['href'])
+
+
+def extract_links(html, page_url, origins=None):
+    """Return normalized http(s) links found in a page on one of ``origins`` (default: the page's own)"""
+    parser = _LinkParser()
+    try:
+        parser.feed(html)
+    except Exception:
+        # Malformed markup: keep whatever was parsed before the error
+        pass
+
+    base = urljoin(page_url, parser.base) if parser.base else page_url
+    origins = origins or {origin_of(page_url)}
+    links = []
+    for href in parser.links:
+        href = href.strip()
+        if href.startswith(('#', 'javascript:', 'mailto:', 'tel:', 'data:')):
+            continue
+        url = urljoin(base, href)
+        if urlparse(url).scheme in ('http', 'https') and origin_of(url) in origins:
+            links.append(normalize_url(url))
+    return links
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter for dedupe when a seen-set would grow too large"""
+    def __init__(self, capacity=1_000_000, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.sha256(item.encode('utf-8')).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:16], 'big') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class Crawler:
+    def __init__(self, start_url, max_depth=2, max_pages=50, concurrency=2, per_host=1, delay=1.0,
+                 show_browser=False, use_bloom=False, respect_robots=True, scraper_options=None, robots_timeout=15,
+                 log=print):
+        self.start_url = normalize_url(start_url)
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.delay = delay
+        self.show_browser = show_browser
+        self.respect_robots = respect_robots
+        self.robots_timeout = robots_timeout
+        self.scraper_options = scraper_options or {}
+        self.log = log
+
+        # The start page's own final origin joins these once it loads, so an http -> https upgrade still crawls
+        self.origins = {origin_of(self.start_url)}
+        self.seen = BloomFilter() if use_bloom else set()
+        self.pages = []
+        self.api_endpoints = {}
+        self._frontier = []
+        self._counter = 0
+        self._started = 0
+        self._in_flight = 0
+        self._next_slot = {}
+        self._robots = {}
+
+    def _enqueue(self, url, depth):
+        if url in self.seen:
+            return
+        self.seen.add(url)
+        # Shallow pages first, then shorter paths (section indexes before deep leaf pages)
+        priority = (depth, urlparse(url).path.count('/'))
+        self._counter += 1
+        heapq.heappush(self._frontier, (priority, self._counter, url, depth))
+
+    def _allowed(self, url):
+        if not self.respect_robots:
+            return True
+        origin = origin_of(url)
+        if origin not in self._robots:
+            self._robots[origin] = self._fetch_robots(origin)
+        robots = self._robots[origin]
+        return robots is None or robots.can_fetch('*', url)
+
+    def _fetch_robots(self, origin):
+        """Parsed robots.txt for an origin, or None (crawl freely) if it can't be fetched"""
+        # RobotFileParser.read() has no timeout, so one stalled host would hang its worker for good
+        from http_fetch import fetch
+
+        robots = RobotFileParser(f"{origin}/robots.txt")
+        try:
+            response, _ = fetch(robots.url, timeout=self.robots_timeout)
+        except Exception:
+            return None
+        # Same rules as RobotFileParser.read(): auth errors block everything, other 4xx allow everything
+        if response.status_code in (401, 403):
+            robots.disallow_all = True
+        elif 400 <= response.status_code < 500:
+            robots.allow_all = True
+        elif response.status_code >= 500:
+            return None
+        else:
+            robots.parse(response.text.splitlines())
+        return robots
+
+    def _scrape(self, url, pool):
+        scraper = WebScraper(pool=pool, **self.scraper_options)
+        scraper.gui_log = lambda msg: None
+        scraper.verbose = False
+        scraper.scrape(url)
+        return scraper
+
+    async def _next(self, ready):
+        async with ready:
+            while True:
+                if self._started >= self.max_pages:
+                    return None
+                if self._frontier:
+                    _, _, url, depth = heapq.heappop(self._frontier)
+                    self._started += 1
+                    self._in_flight += 1
+                    return url, depth
+                if self._in_flight == 0:
+                    return None
+                await ready.wait()
+
+    async def _polite(self, host, lock):
+        loop = asyncio.get_running_loop()
+        async with lock:
+            now = loop.time()
+            start = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = start + self.delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def _worker(self, pool, ready, host_limits, polite_lock):
+        while True:
+            item = await self._next(ready)
+            if item is None:
+                return
+            url, depth = item
+            host = urlparse(url).netloc
+            links = []
+            started = time.monotonic()
+            try:
+                if not await asyncio.to_thread(self._allowed, url):
+                    self.pages.append({'url': url, 'depth': depth, 'ok': False, 'error': 'disallowed by robots.txt'})
+                    self.log(f"🚫 {url} (robots.txt)")
+                    continue
+                async with host_limits[host]:
+                    await self._polite(host, polite_lock)
+                    scraper = await asyncio.to_thread(self._scrape, url, pool)
+
+                final_url = scraper.page_content.get('url') or url
+                if depth == 0:
+                    self.origins.add(origin_of(final_url))
+                if origin_of(final_url) not in self.origins:
+                    # A same-origin link redirected off-site; that site's links aren't ours to follow
+                    self.log(f"↪️  {url} redirected to {final_url}, not following its links")
+                elif depth < self.max_depth:
+                    links = extract_links(scraper.page_content.get('html', ''), final_url, self.origins)
+                for group in scraper.endpoint_groups.groups():
+                    key = f"{group['method']} {group['template']}"
+                    entry = self.api_endpoints.setdefault(key, {
+                        'method': group['method'], 'template': group['template'], 'url': group['sample_url'],
+                        'status': scraper.endpoint_groups.sample(group)['status'], 'found_on': url, 'calls': 0})
+                    entry['calls'] += group['count']
+                self.pages.append({'url': url, 'depth': depth, 'ok': True, 'result_file': scraper.result_file,
+                                   'api_endpoints': scraper.endpoint_groups.count, 'links': len(links),
+                                   'elapsed_s': round(time.monotonic() - started, 3)})
+                self.log(f"[{len(self.pages)}/{self.max_pages}] ✅ depth {depth} {url} "
+                         f"({scraper.endpoint_groups.count} APIs, {len(links)} links)")
+            except Exception as e:
+                self.pages.append({'url': url, 'depth': depth, 'ok': False, 'error': str(e)})
+                self.log(f"[{len(self.pages)}/{self.max_pages}] ❌ {url}: {e}")
+            finally:
+                async with ready:
+                    self._in_flight -= 1
+                    for link in links:
+                        self._enqueue(link, depth + 1)
+                    ready.notify_all()
+
+    async def crawl(self):
+        ready = asyncio.Condition()
+        host_limits = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+        polite_lock = asyncio.Lock()
+        self._enqueue(self.start_url, 0)
+
+        pool = BrowserPool(size=self.concurrency, show_browser=self.show_browser)
+        try:
+            await asyncio.gather(*(self._worker(pool, ready, host_limits, polite_lock)
+                                   for _ in range(self.concurrency)))
+        finally:
+            await asyncio.to_thread(pool.close)
+        return self.summary()
+
+    def run(self):
+        return asyncio.run(self.crawl())
+
+    def summary(self):
+        return {
+            'start_url': self.start_url,
+            'max_depth': self.max_depth,
+            'max_pages': self.max_pages,
+            'pages_crawled': sum(1 for p in self.pages if p['ok']),
+            'pages_failed': sum(1 for p in self.pages if not p['ok']),
+            'frontier_remaining': len(self._frontier),
+            'pages': self.pages,
+            'api_endpoints': list(self.api_endpoints.values())
+        }
+
+
+def save_crawl_summary(summary):
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    domain = urlparse(summary['start_url']).netloc.replace('.', '_').replace(':', '_')
+    os.makedirs('scrape_results', exist_ok=True)
+    path = f"scrape_results/{domain}_{timestamp}_crawl.json"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    return path
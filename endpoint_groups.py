@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Group API calls that only differ by IDs into URL templates.
+
+A chatty page calling /api/items/1, /api/items/2 ... is reported as one
+``GET /api/items/{id}`` group with a call count, a status distribution and a
+representative sample, instead of hundreds of near-identical entries.
+Numeric, UUID, long hex and token-like path segments become placeholders and
+query strings keep only their (sorted) parameter names.
+"""
+import re
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+SEGMENT_PATTERNS = [
+    ('{id}', re.compile(r'^\d+$')),
+    ('{uuid}', re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.I)),
+    ('{hash}', re.compile(r'^[0-9a-f]{16,}$', re.I)),
+    ('{token}', re.compile(r'^(?=.*\d)(?=.*[A-Za-z])[A-Za-z0-9_-]{24,}$')),
+]
+
+# Query parameters whose value names the operation rather than varying per call
+KEEP_QUERY_VALUES = {'operationName', 'op', 'action', 'method'}
+
+
+def _segment(segment):
+    for placeholder, pattern in SEGMENT_PATTERNS:
+        if pattern.match(segment):
+            return placeholder
+    return segment
+
+
+def url_template(url):
+    """Normalize a URL into a template such as https://host/api/items/{id}?page={page}"""
+    parts = urlsplit(url)
+    path = '/'.join(_segment(segment) for segment in parts.path.split('/'))
+    params = {}
+    for key, value in parse_qsl(parts.query, keep_blank_values=True):
+        params.setdefault(key, value if key in KEEP_QUERY_VALUES else f"{{{key}}}")
+    query = '&'.join(f"{key}={params[key]}" for key in sorted(params))
+    return urlunsplit((parts.scheme, parts.netloc, path, query, ''))
+
+
+def _is_better_sample(candidate, current):
+    # Prefer a successful response that has a body to show
+    def score(endpoint):
+        has_body = bool(endpoint.get('body') or endpoint.get('body_file') or endpoint.get('body_blob'))
+        ok = isinstance(endpoint.get('status'), int) and 200 <= endpoint['status'] < 300
+        return (ok and has_body, has_body, ok)
+    return score(candidate) > score(current)
+
+
+class EndpointGroups:
+    """Builds the groups one endpoint at a time, keeping only each group's summary and sample.
+
+    Streamed scrapes use this instead of holding every endpoint record until the end.
+    """
+    def __init__(self):
+        self.count = 0
+        self._groups = {}
+        self._samples = {}
+
+    def add(self, endpoint):
+        key = (endpoint['method'], url_template(endpoint['url']))
+        group = self._groups.get(key)
+        if group is None:
+            self._groups[key] = group = {
+                'method': key[0],
+                'template': key[1],
+                'count': 0,
+                'statuses': {},
+                'content_type': endpoint.get('content_type'),
+                'matched_rule': endpoint.get('matched_rule'),
+                'sample_url': endpoint['url'],
+                'sample_index': self.count
+            }
+            self._samples[key] = endpoint
+        elif _is_better_sample(endpoint, self._samples[key]):
+            group['sample_url'] = endpoint['url']
+            group['sample_index'] = self.count
+            self._samples[key] = endpoint
+        group['count'] += 1
+        status = str(endpoint.get('status'))
+        group['statuses'][status] = group['statuses'].get(status, 0) + 1
+        self.count += 1
+
+    def groups(self):
+        """The groups in order of first appearance (copies, safe to serialize)"""
+        return [dict(group, statuses=dict(group['statuses'])) for group in self._groups.values()]
+
+    def sample(self, group):
+        """The endpoint record chosen as a group's sample"""
+        return self._samples[(group['method'], group['template'])]
+
+
+def group_endpoints(api_endpoints):
+    """Aggregate endpoints by (method, URL template), in order of first appearance.
+
+    Each group has method, template, count, statuses (status -> calls), content_type,
+    matched_rule, sample_url and sample_index (position of the sample in api_endpoints).
+    """
+    groups = EndpointGroups()
+    for endpoint in api_endpoints:
+        groups.add(endpoint)
+    return groups.groups()
+
+
+def format_statuses(statuses):
+    """'200' for a single status, '200 ×98, 404 ×2' for a mix"""
+    if len(statuses) == 1:
+        return next(iter(statuses))
+    ordered = sorted(statuses.items(), key=lambda item: -item[1])
+    return ", ".join(f"{status} ×{count}" for status, count in ordered)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+HTTP-only fast path for pages that don't need JavaScript rendering.
+
+Pages are fetched with a pooled requests.Session (keep-alive, connection
+pooling, gzip/deflate and brotli when available) and wrapped so that
+WebScraper can record them exactly like selenium-wire captures.
+"""
+import html as html_lib
+import re
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import brotli  # noqa: F401  (urllib3 decodes 'br' when this is installed)
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_HEADERS = {
+    'User-Agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                   '(KHTML, like Gecko) Chrome/120.0 Safari/537.36'),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': ACCEPT_ENCODING,
+}
+
+_local = threading.local()
+
+
+def get_session(pool_size=16):
+    """Return this thread's pooled session, creating it on first use"""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update(DEFAULT_HEADERS)
+        _local.session = session
+    return session
+
+
+class CapturedResponse:
+    """Response shaped like selenium-wire's, backed by a requests.Response"""
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.headers = response.headers
+        # requests has already undone Content-Encoding, so the body is plain bytes
+        self.body = response.content
+        self.already_decoded = True
+
+
+class CapturedRequest:
+    """Request shaped like selenium-wire's so WebScraper._capture can record it"""
+    def __init__(self, response):
+        self.url = response.url
+        self.method = response.request.method
+        self.headers = response.request.headers
+        self.body = response.request.body or b''
+        self.response = CapturedResponse(response)
+
+
+def fetch(url, timeout=15, method='GET', headers=None):
+    """Fetch a URL and return (final response, captured requests including redirect hops)"""
+    response = get_session().request(method, url, headers=headers, timeout=timeout, allow_redirects=True)
+    return response, [CapturedRequest(r) for r in response.history + [response]]
+
+
+TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title>', re.I | re.S)
+SCRIPT_STYLE_RE = re.compile(r'<(script|style|noscript|template)\b.*?</\1\s*>', re.I | re.S)
+TAG_RE = re.compile(r'<[^>]+>')
+SCRIPT_RE = re.compile(r'<script\b', re.I)
+EMPTY_MOUNT_RE = re.compile(
+    r'<(div|main|section)\b[^>]*\bid=["\'](?:root|app|__next|__nuxt|svelte|main-app)["\'][^>]*>\s*</\1>'
+    r'|<app-root[^>]*>\s*</app-root>',
+    re.I
+)
+NOSCRIPT_JS_RE = re.compile(r'<noscript[^>]*>[^<]*(?:enable|requires?|need)\s+javascript', re.I)
+
+
+def page_title(html):
+    match = TITLE_RE.search(html)
+    return html_lib.unescape(match.group(1).strip()) if match else ''
+
+
+def visible_text_length(html):
+    text = TAG_RE.sub(' ', SCRIPT_STYLE_RE.sub(' ', html))
+    return len(' '.join(html_lib.unescape(text).split()))
+
+
+def looks_js_rendered(html, min_text=500):
+    """Guess whether static HTML is an empty shell that JavaScript fills in"""
+    if NOSCRIPT_JS_RE.search(html) or EMPTY_MOUNT_RE.search(html):
+        return True
+    return bool(SCRIPT_RE.search(html)) and visible_text_length(html) < min_text
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Per-phase timing and counters for WebScraper.
+
+ScrapeMetrics records how long each phase of a scrape took (browser,
+navigate, wait, capture, save...) and counts what was captured and written.
+The result is stored in scrape_info['metrics'] and can be exported as
+Prometheus text or StatsD lines. Callers can subscribe to phase events:
+
+    scraper.metrics.subscribe(lambda event: print(event['event'], event['phase']))
+"""
+import socket
+import time
+from contextlib import contextmanager
+
+COUNTERS = {
+    'requests_captured': "Requests captured from the browser",
+    'bytes_buffered': "Response body bytes held by selenium-wire",
+    'endpoints_found': "API endpoints detected",
+    'write_bytes': "Bytes written to scrape_results",
+}
+
+
+class ScrapeMetrics:
+    def __init__(self):
+        self.phases = {}
+        self.counters = {name: 0 for name in COUNTERS}
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        """Call ``callback(event)`` on every phase_start/phase_end event"""
+        self._subscribers.append(callback)
+
+    def _emit(self, event):
+        for callback in self._subscribers:
+            try:
+                callback(event)
+            except Exception:
+                # A broken subscriber must not break the scrape
+                pass
+
+    @contextmanager
+    def phase(self, name):
+        """Accumulate wall-clock time spent in one phase"""
+        started = time.perf_counter()
+        self._emit({'event': 'phase_start', 'phase': name, 'time': time.time()})
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.phases[name] = round(self.phases.get(name, 0) + elapsed, 4)
+            self._emit({'event': 'phase_end', 'phase': name, 'time': time.time(), 'elapsed_s': round(elapsed, 4)})
+
+    def incr(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self):
+        return {'phases_s': dict(self.phases), 'counters': dict(self.counters)}
+
+    def to_prometheus(self, labels=None):
+        """Render as Prometheus text exposition format (e.g. for the node_exporter textfile collector)"""
+        label_text = ",".join(f'{k}="{v}"' for k, v in sorted((labels or {}).items()))
+
+        def series(name, extra=''):
+            inner = ",".join(part for part in (extra, label_text) if part)
+            return f"{name}{{{inner}}}" if inner else name
+
+        lines = [
+            "# HELP scraper_phase_seconds Wall-clock seconds spent in each scrape phase",
+            "# TYPE scraper_phase_seconds gauge",
+        ]
+        for phase, seconds in self.phases.items():
+            phase_label = f'phase="{phase}"'
+            lines.append(f"{series('scraper_phase_seconds', phase_label)} {seconds}")
+        for name, value in self.counters.items():
+            lines.append(f"# HELP scraper_{name} {COUNTERS.get(name, name)}")
+            lines.append(f"# TYPE scraper_{name} gauge")
+            lines.append(f"{series('scraper_' + name)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def to_statsd(self, prefix='scraper'):
+        lines = [f"{prefix}.phase.{phase}:{round(seconds * 1000, 1)}|ms" for phase, seconds in self.phases.items()]
+        lines += [f"{prefix}.{name}:{value}|c" for name, value in self.counters.items()]
+        return lines
+
+    def send_statsd(self, address, prefix='scraper'):
+        """Send all metrics to a StatsD server given as 'host:port' over UDP"""
+        host, _, port = address.rpartition(':')
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            for line in self.to_statsd(prefix):
+                sock.sendto(line.encode('utf-8'), (host or 'localhost', int(port)))
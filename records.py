@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Compact records for captured requests and responses.
+
+A page with thousands of requests used to keep a dict per request plus a
+full ``dict(headers)`` copy for every request and response. Records here use
+``__slots__`` and store headers as tuples of (name, value) pairs drawn from
+a per-scraper HeaderTable, which interns header names and shares identical
+pairs and identical header lists between records.
+
+Records behave like read-only dicts for existing callers (``record['url']``,
+``record.get('body')``, ``dict(record)``) and serialize to the same JSON
+shape as before; pass ``default=dict`` to json.dump(s).
+"""
+import sys
+from collections.abc import Mapping
+
+
+class HeaderTable:
+    """Shares header names, values and whole header lists between records"""
+    def __init__(self):
+        self._values = {}
+        self._pairs = {}
+        self._tables = {}
+
+    def value(self, value):
+        return self._values.setdefault(value, value)
+
+    def intern(self, headers):
+        # dict() first so duplicate headers collapse exactly as dict(request.headers) did
+        table = []
+        for name, value in dict(headers).items():
+            pair = (sys.intern(str(name)), self.value(value))
+            table.append(self._pairs.setdefault(pair, pair))
+        table = tuple(table)
+        return self._tables.setdefault(table, table)
+
+
+class _Record(Mapping):
+    __slots__ = ()
+    _KEYS = ()
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        try:
+            value = getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+        return dict(value) if key == 'headers' else value
+
+    def __setitem__(self, key, value):
+        if key not in self._KEYS or key in ('type', 'headers'):
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __iter__(self):
+        return (key for key in self._KEYS if hasattr(self, key))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class RequestRecord(_Record):
+    __slots__ = ('url', 'method', 'headers')
+    _KEYS = ('url', 'method', 'headers', 'type')
+    type = 'request'
+
+    def __init__(self, url, method, headers):
+        self.url = url
+        self.method = method
+        self.headers = headers
+
+
+class ResponseRecord(_Record):
+    """API response; optional fields only appear once they are set"""
+    __slots__ = ('url', 'method', 'status', 'content_type', 'headers', 'matched_rule',
+                 'cache', 'body_sha256', 'body_size', 'body_truncated', 'body', 'body_file', 'body_blob')
+    _KEYS = ('url', 'method', 'status', 'content_type', 'headers', 'type', 'matched_rule',
+             'cache', 'body_sha256', 'body_size', 'body_truncated', 'body', 'body_file', 'body_blob')
+    type = 'response'
+
+    def __init__(self, url, method, status, content_type, headers):
+        self.url = url
+        self.method = method
+        self.status = status
+        self.content_type = content_type
+        self.headers = headers
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Replay the API endpoints captured by a previous scrape without a browser.
+
+A browser scrape records each API call's method, URL and request headers
+(cookies included). Replay loads a .json or .ndjson result file and
+re-issues those requests concurrently through the pooled HTTP client from
+http_fetch, under a global rate limit and a concurrency cap. The fresh
+responses are saved exactly like a normal scrape, so --diff and
+--response-cache work on replays too:
+
+    python scraper.py --replay scrape_results/example_com_20240101_120000.json --rate 2 --every 300
+
+Only GET and HEAD requests are replayed; request bodies are not captured,
+so other methods are skipped and counted in the summary.
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from http_fetch import fetch
+from scraper import WebScraper
+
+REPLAYABLE_METHODS = ('GET', 'HEAD')
+
+# Set per connection by the HTTP client, or only meaningful to the proxy/browser that captured them
+SKIP_HEADERS = {'host', 'content-length', 'connection', 'keep-alive', 'proxy-connection',
+                'transfer-encoding', 'te', 'upgrade', 'accept-encoding'}
+
+
+def load_capture(path):
+    """Return (target_url, endpoints) from a result file; each endpoint has method, url and request headers"""
+    target_url = None
+    request_headers = {}
+    responses = []
+
+    if path.endswith('.ndjson'):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                if record.get('type') == 'scrape_info':
+                    target_url = record.get('target_url')
+                elif record.get('type') == 'request':
+                    request_headers.setdefault(f"{record['method']} {record['url']}", record.get('headers', {}))
+                elif record.get('type') == 'response':
+                    responses.append(record)
+    else:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        target_url = data['scrape_info'].get('target_url')
+        for record in data.get('all_requests', []):
+            request_headers.setdefault(f"{record['method']} {record['url']}", record.get('headers', {}))
+        responses = data.get('api_endpoints', [])
+
+    endpoints = {}
+    for record in responses:
+        key = f"{record['method']} {record['url']}"
+        endpoints.setdefault(key, {
+            'method': record['method'],
+            'url': record['url'],
+            'headers': request_headers.get(key, {})
+        })
+    return target_url, list(endpoints.values())
+
+
+class RateLimiter:
+    """Space calls out to at most ``rate`` per second across all threads"""
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def replay_headers(headers):
+    return {k: v for k, v in headers.items() if k.lower() not in SKIP_HEADERS and not k.startswith(':')}
+
+
+def _replay_one(endpoint, limiter, timeout):
+    limiter.wait()
+    _, captured = fetch(endpoint['url'], timeout=timeout, method=endpoint['method'],
+                        headers=replay_headers(endpoint['headers']))
+    return captured
+
+
+def replay(result_file, workers=4, rate=None, timeout=15, scraper_options=None, log=print):
+    """Re-issue a previous scrape's API requests and save the responses as a new result; returns the scraper"""
+    target_url, endpoints = load_capture(result_file)
+    replayable = [e for e in endpoints if e['method'] in REPLAYABLE_METHODS]
+    skipped = len(endpoints) - len(replayable)
+
+    log(f"\n{'='*80}")
+    log(f"🔁 Replaying {len(replayable)} API endpoints from: {result_file}")
+    log(f"{'='*80}\n")
+    if skipped:
+        log(f"⏭️  Skipping {skipped} endpoints with methods other than {'/'.join(REPLAYABLE_METHODS)}")
+
+    scraper = WebScraper(**(scraper_options or {}))
+    scraper.page_content = {'url': target_url, 'html': ''}
+    scraper.scrape_info['fetch_mode'] = 'replay'
+    failures = []
+
+    def responses(pool, limiter):
+        # Submit everything up front, then record in capture order as each finishes
+        futures = [(endpoint, pool.submit(_replay_one, endpoint, limiter, timeout)) for endpoint in replayable]
+        for endpoint, future in futures:
+            try:
+                yield from future.result()
+            except Exception as e:
+                failures.append({'method': endpoint['method'], 'url': endpoint['url'], 'error': str(e)})
+                log(f"❌ {endpoint['method']} {endpoint['url']}: {e}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        scraper._capture_all(target_url, responses(pool, RateLimiter(rate)), log)
+
+    scraper.scrape_info['replay'] = {
+        'source': result_file,
+        'endpoints': len(endpoints),
+        'replayed': len(replayable) - len(failures),
+        'skipped_methods': skipped,
+        'failed': failures
+    }
+    log(f"✅ Replayed {len(replayable) - len(failures)}/{len(replayable)} endpoints "
+        f"in {time.perf_counter() - started:.1f}s\n")
+    scraper._finish_scrape(target_url, started, log)
+    return scraper
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Persistent response cache for repeat scrapes.
+
+API responses are stored in SQLite keyed by a fingerprint of the request
+(method, URL, request body and a few content-negotiation headers). On the
+next scrape each response is reported as 'new', 'changed' or 'unchanged',
+and unchanged bodies do not need to be written out again.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_FILE = os.path.join('scrape_results', 'response_cache.sqlite')
+DEFAULT_KEY_HEADERS = ('accept', 'accept-language', 'content-type')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    fingerprint TEXT PRIMARY KEY,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    status INTEGER,
+    headers TEXT,
+    body_sha256 TEXT,
+    body BLOB,
+    size INTEGER NOT NULL DEFAULT 0,
+    stored_at REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_seen ON responses(last_seen);
+"""
+
+
+class ResponseCache:
+    """SQLite-backed cache of API responses with TTL and size-based eviction.
+
+    ttl            entries not seen for this many seconds are dropped
+    max_bytes      once stored bodies exceed this size the least recently seen are evicted
+    store_bodies   keep the body itself, not just its hash
+    key_headers    request headers (lower-case) that are part of the fingerprint
+    """
+    def __init__(self, path=DEFAULT_CACHE_FILE, ttl=7 * 24 * 3600, max_bytes=512 * 1024 * 1024,
+                 store_bodies=True, key_headers=DEFAULT_KEY_HEADERS):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.store_bodies = store_bodies
+        self.key_headers = tuple(h.lower() for h in key_headers)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def __getstate__(self):
+        # Batch worker processes get a copy without the open connection and reconnect lazily
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        state['_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def fingerprint(self, method, url, request_headers, request_body=b''):
+        headers = {k.lower(): v for k, v in request_headers.items()}
+        h = hashlib.sha256()
+        h.update(method.upper().encode())
+        h.update(b'\0' + url.encode())
+        for name in self.key_headers:
+            h.update(f"\0{name}:{headers.get(name, '')}".encode())
+        h.update(b'\0' + hashlib.sha256(request_body or b'').digest())
+        return h.hexdigest()
+
+    def check(self, method, url, request_headers, status, response_headers, body, request_body=b''):
+        """Compare a response with the cached one, store it, and return (state, body_sha256).
+
+        state is 'new', 'changed' or 'unchanged'.
+        """
+        body = body or b''
+        digest = hashlib.sha256(body).hexdigest()
+        key = self.fingerprint(method, url, request_headers, request_body)
+        now = time.time()
+
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT status, body_sha256, last_seen FROM responses WHERE fingerprint = ?", (key,)
+            ).fetchone()
+
+            if row and now - row[2] <= self.ttl and row[0] == status and row[1] == digest:
+                conn.execute("UPDATE responses SET last_seen = ? WHERE fingerprint = ?", (now, key))
+                conn.commit()
+                return 'unchanged', digest
+
+            state = 'changed' if row and now - row[2] <= self.ttl else 'new'
+            conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(fingerprint, method, url, status, headers, body_sha256, body, size, stored_at, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, method, url, status, json.dumps(dict(response_headers)), digest,
+                 body if self.store_bodies else None, len(body) if self.store_bodies else 0, now, now)
+            )
+            conn.commit()
+            return state, digest
+
+    def get(self, method, url, request_headers, request_body=b''):
+        """Return the cached entry for a request as a dict, or None"""
+        key = self.fingerprint(method, url, request_headers, request_body)
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT status, headers, body_sha256, body, last_seen FROM responses WHERE fingerprint = ?", (key,)
+            ).fetchone()
+        if not row or time.time() - row[4] > self.ttl:
+            return None
+        return {'status': row[0], 'headers': json.loads(row[1]), 'body_sha256': row[2], 'body': row[3]}
+
+    def evict(self):
+        """Drop expired entries, then the least recently seen until stored bodies fit in max_bytes"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM responses WHERE last_seen < ?", (time.time() - self.ttl,))
+
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            while total > self.max_bytes:
+                victims = conn.execute(
+                    "SELECT fingerprint, size FROM responses ORDER BY last_seen LIMIT 500"
+                ).fetchall()
+                if not victims:
+                    break
+                for fingerprint, size in victims:
+                    conn.execute("DELETE FROM responses WHERE fingerprint = ?", (fingerprint,))
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Queryable SQLite index over scrape_results.
+
+Every saved run is recorded with its domain, timestamp and API endpoints
+(method, URL, status, content type, body hash), so questions like "every run
+where this endpoint returned 500" don't require opening every result file.
+Endpoint URLs are also in an FTS5 table for word search when SQLite has it.
+
+    python results_index.py find --status 500 --search "api/v1/orders"
+    python results_index.py runs --domain example.com
+    python results_index.py rebuild          # index result files saved before the index existed
+    python results_index.py merge node1/scrape_results/index.sqlite node2/scrape_results/index.sqlite
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+from urllib.parse import quote, urlparse
+
+from bodies import inline_body
+from scrape_diff import endpoint_digest
+
+DEFAULT_INDEX_FILE = os.path.join('scrape_results', 'index.sqlite')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    result_file TEXT NOT NULL UNIQUE,
+    domain TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    target_url TEXT,
+    final_url TEXT,
+    title TEXT,
+    fetch_mode TEXT,
+    request_count INTEGER,
+    endpoint_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_domain_timestamp ON runs(domain, timestamp);
+CREATE INDEX IF NOT EXISTS runs_timestamp ON runs(timestamp);
+
+CREATE TABLE IF NOT EXISTS endpoints (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    status INTEGER,
+    content_type TEXT,
+    body_sha256 TEXT,
+    body_size INTEGER
+);
+CREATE INDEX IF NOT EXISTS endpoints_run ON endpoints(run_id);
+CREATE INDEX IF NOT EXISTS endpoints_url_status ON endpoints(url, status);
+CREATE INDEX IF NOT EXISTS endpoints_status ON endpoints(status);
+CREATE INDEX IF NOT EXISTS endpoints_body_sha256 ON endpoints(body_sha256);
+"""
+
+FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS endpoints_fts USING fts5(url, content_type)"
+
+ENDPOINT_COLUMNS = ('timestamp', 'domain', 'result_file', 'method', 'url', 'status', 'content_type',
+                    'body_sha256', 'body_size')
+
+
+def _domain(url):
+    return urlparse(url or '').netloc
+
+
+def _fts_phrase(text):
+    """Turn free text such as 'api/v1/orders' into an FTS5 phrase query for those URL words"""
+    words = re.findall(r'\w+', text)
+    return '"' + ' '.join(words) + '"' if words else None
+
+
+class ResultsIndex:
+    """SQLite index of saved runs and their API endpoints"""
+    def __init__(self, path=DEFAULT_INDEX_FILE):
+        self.path = path
+        self.fts = False
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def __getstate__(self):
+        # Batch worker processes get a copy without the open connection and reconnect lazily
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        state['_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            try:
+                self._conn.execute(FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5: --search falls back to LIKE
+                self.fts = False
+        return self._conn
+
+    def _delete_run(self, conn, result_file):
+        row = conn.execute("SELECT id FROM runs WHERE result_file = ?", (result_file,)).fetchone()
+        if not row:
+            return
+        if self.fts:
+            conn.execute("DELETE FROM endpoints_fts WHERE rowid IN (SELECT id FROM endpoints WHERE run_id = ?)",
+                         (row[0],))
+        conn.execute("DELETE FROM endpoints WHERE run_id = ?", (row[0],))
+        conn.execute("DELETE FROM runs WHERE id = ?", (row[0],))
+
+    def add_run(self, result_file, info, api_endpoints):
+        """Record one saved run, replacing any earlier entry for the same result file.
+
+        info holds timestamp, target_url and optionally final_url, title, fetch_mode, request_count.
+        """
+        endpoints = [(e['method'], e['url'], e.get('status'), e.get('content_type'), endpoint_digest(e),
+                      e.get('body_size') or (len(inline_body(e)) if e.get('body') is not None else None))
+                     for e in api_endpoints]
+        run = (_domain(info.get('target_url')), info['timestamp'], info.get('target_url'), info.get('final_url'),
+               info.get('title'), info.get('fetch_mode'), info.get('request_count'))
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                return self._insert_run(conn, result_file, run, endpoints)
+
+    def _insert_run(self, conn, result_file, run, endpoints):
+        # run is (domain, timestamp, target_url, final_url, title, fetch_mode, request_count)
+        self._delete_run(conn, result_file)
+        run_id = conn.execute(
+            "INSERT INTO runs (result_file, domain, timestamp, target_url, final_url, title, fetch_mode, "
+            "request_count, endpoint_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (result_file,) + tuple(run) + (len(endpoints),)
+        ).lastrowid
+        for endpoint in endpoints:
+            endpoint_id = conn.execute(
+                "INSERT INTO endpoints (run_id, method, url, status, content_type, body_sha256, body_size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", (run_id,) + tuple(endpoint)
+            ).lastrowid
+            if self.fts:
+                conn.execute("INSERT INTO endpoints_fts (rowid, url, content_type) VALUES (?, ?, ?)",
+                             (endpoint_id, endpoint[1], endpoint[3] or ''))
+        return run_id
+
+    def merge(self, other_path, prefix=None):
+        """Copy every run from another index (one per scraping node, say) into this one; returns the run count.
+
+        Relative result_file paths are re-rooted at ``prefix`` (default: the folder holding the other
+        index's scrape_results) so they still open from here. Merging the same index again just refreshes it.
+        """
+        if not os.path.isfile(other_path):
+            raise FileNotFoundError(other_path)
+        if prefix is None:
+            prefix = os.path.relpath(os.path.dirname(os.path.dirname(os.path.abspath(other_path))))
+        source = sqlite3.connect(f"file:{quote(os.path.abspath(other_path))}?mode=ro", uri=True)
+        try:
+            runs = source.execute("SELECT id, result_file, domain, timestamp, target_url, final_url, title, "
+                                  "fetch_mode, request_count FROM runs ORDER BY id").fetchall()
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    for run in runs:
+                        endpoints = source.execute(
+                            "SELECT method, url, status, content_type, body_sha256, body_size FROM endpoints "
+                            "WHERE run_id = ? ORDER BY id", (run[0],)
+                        ).fetchall()
+                        result_file = run[1]
+                        if not os.path.isabs(result_file):
+                            result_file = os.path.normpath(os.path.join(prefix, result_file))
+                        self._insert_run(conn, result_file, run[2:], endpoints)
+        finally:
+            source.close()
+        return len(runs)
+
+    def index_file(self, path):
+        """Index a result file already on disk (.json or .ndjson)"""
+        info, endpoints = {}, []
+        if path.endswith('.ndjson'):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    record = json.loads(line)
+                    if record.get('type') in ('scrape_info', 'summary'):
+                        info.update(record)
+                    elif record.get('type') == 'response':
+                        endpoints.append(record)
+        else:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            info = dict(data.get('scrape_info', {}))
+            info.setdefault('request_count', len(data.get('all_requests', [])))
+            endpoints = data.get('api_endpoints', [])
+        if 'timestamp' not in info:
+            raise ValueError(f"{path} is not a scrape result")
+        return self.add_run(path, info, endpoints)
+
+    def rebuild(self, results_dir='scrape_results', log=print):
+        """Index every result file in results_dir; returns (indexed, skipped)"""
+        indexed = skipped = 0
+        for name in sorted(os.listdir(results_dir)):
+            if not name.endswith(('.json', '.ndjson')) or name.endswith(('_crawl.json', '_diff.json')):
+                continue
+            try:
+                self.index_file(os.path.join(results_dir, name))
+                indexed += 1
+            except (ValueError, KeyError, json.JSONDecodeError, OSError, UnicodeDecodeError) as e:
+                skipped += 1
+                log(f"⚠️  Skipped {name}: {e}")
+        return indexed, skipped
+
+    def find_endpoints(self, domain=None, url=None, url_contains=None, search=None, status=None, min_status=None,
+                       method=None, content_type=None, body_sha256=None, since=None, until=None, limit=100):
+        """Endpoint observations matching every given filter, newest run first"""
+        where, params = [], []
+        for column, value in (('r.domain', domain), ('e.url', url), ('e.method', method and method.upper()),
+                              ('e.body_sha256', body_sha256)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if status is not None:
+            statuses = [status] if isinstance(status, int) else list(status)
+            where.append(f"e.status IN ({','.join('?' * len(statuses))})")
+            params.extend(statuses)
+        if min_status is not None:
+            where.append("e.status >= ?")
+            params.append(min_status)
+        if url_contains:
+            where.append("e.url LIKE ?")
+            params.append(f"%{url_contains}%")
+        if content_type:
+            where.append("e.content_type LIKE ?")
+            params.append(f"%{content_type}%")
+        if since:
+            where.append("r.timestamp >= ?")
+            params.append(since)
+        if until:
+            where.append("r.timestamp <= ?")
+            params.append(until)
+
+        with self._lock:
+            conn = self._connect()
+            if search:
+                phrase = _fts_phrase(search)
+                if self.fts and phrase:
+                    where.append("e.id IN (SELECT rowid FROM endpoints_fts WHERE endpoints_fts MATCH ?)")
+                    params.append(f"url : {phrase}")
+                else:
+                    where.append("e.url LIKE ?")
+                    params.append(f"%{search}%")
+            sql = ("SELECT r.timestamp, r.domain, r.result_file, e.method, e.url, e.status, e.content_type, "
+                   "e.body_sha256, e.body_size FROM endpoints e JOIN runs r ON r.id = e.run_id")
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+            sql += " ORDER BY r.timestamp DESC, e.id LIMIT ?"
+            rows = conn.execute(sql, params + [limit]).fetchall()
+        return [dict(zip(ENDPOINT_COLUMNS, row)) for row in rows]
+
+    def runs(self, domain=None, limit=20):
+        """Most recent runs, optionally for one domain"""
+        sql = ("SELECT result_file, domain, timestamp, target_url, title, fetch_mode, request_count, endpoint_count "
+               "FROM runs")
+        params = []
+        if domain:
+            sql += " WHERE domain = ?"
+            params.append(domain)
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        with self._lock:
+            rows = self._connect().execute(sql, params + [limit]).fetchall()
+        columns = ('result_file', 'domain', 'timestamp', 'target_url', 'title', 'fetch_mode', 'request_count',
+                   'endpoint_count')
+        return [dict(zip(columns, row)) for row in rows]
+
+    def stats(self):
+        with self._lock:
+            conn = self._connect()
+            runs, domains = conn.execute("SELECT COUNT(*), COUNT(DISTINCT domain) FROM runs").fetchone()
+            endpoints = conn.execute("SELECT COUNT(*) FROM endpoints").fetchone()[0]
+        return {'runs': runs, 'domains': domains, 'endpoints': endpoints}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def print_endpoints(rows):
+    for row in rows:
+        print(f"{row['timestamp']}  {row['status'] or '-':>3}  {row['method']:<6} {row['url']}")
+        print(f"    {row['result_file']}" + (f"  sha256 {row['body_sha256'][:12]}" if row['body_sha256'] else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the index of saved scrape results")
+    parser.add_argument('--index', default=DEFAULT_INDEX_FILE, help=f"index file (default: {DEFAULT_INDEX_FILE})")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    find = commands.add_parser('find', help="find endpoint observations")
+    find.add_argument('--domain')
+    find.add_argument('--url', help="exact endpoint URL")
+    find.add_argument('--url-contains', metavar='TEXT', help="substring of the endpoint URL")
+    find.add_argument('--search', metavar='WORDS', help="URL words in order, e.g. 'api/v1/orders' (full-text)")
+    find.add_argument('--status', type=int, action='append', help="HTTP status (repeatable)")
+    find.add_argument('--min-status', type=int, help="status at least this, e.g. 500 for server errors")
+    find.add_argument('--method')
+    find.add_argument('--content-type')
+    find.add_argument('--body-sha256')
+    find.add_argument('--since', metavar='YYYYMMDD[_HHMMSS]')
+    find.add_argument('--until', metavar='YYYYMMDD[_HHMMSS]')
+    find.add_argument('--limit', type=int, default=50)
+    find.add_argument('--json', action='store_true', help="print matches as JSON")
+
+    runs = commands.add_parser('runs', help="list recent runs")
+    runs.add_argument('--domain')
+    runs.add_argument('--limit', type=int, default=20)
+
+    commands.add_parser('stats', help="count runs, domains and endpoints")
+
+    rebuild = commands.add_parser('rebuild', help="index result files saved before the index existed")
+    rebuild.add_argument('--results-dir', default='scrape_results')
+
+    merge = commands.add_parser('merge', help="consolidate other indexes (e.g. from each scraping node) into this one")
+    merge.add_argument('sources', nargs='+', metavar='INDEX', help="index.sqlite files to merge in")
+    merge.add_argument('--prefix', help="folder to re-root their result file paths at "
+                                        "(default: the folder holding each source's scrape_results)")
+    args = parser.parse_args()
+
+    index = ResultsIndex(args.index)
+    if args.command == 'find':
+        rows = index.find_endpoints(domain=args.domain, url=args.url, url_contains=args.url_contains,
+                                    search=args.search, status=args.status, min_status=args.min_status,
+                                    method=args.method,
+                                    content_type=args.content_type, body_sha256=args.body_sha256,
+                                    since=args.since, until=args.until, limit=args.limit)
+        if args.json:
+            print(json.dumps(rows, indent=2))
+        else:
+            print_endpoints(rows)
+            print(f"\n🔎 {len(rows)} matches" + (" (limit reached)" if len(rows) == args.limit else ""))
+    elif args.command == 'runs':
+        for run in index.runs(args.domain, args.limit):
+            print(f"{run['timestamp']}  {run['domain']:<30} {run['endpoint_count']:>4} APIs  {run['result_file']}")
+    elif args.command == 'stats':
+        stats = index.stats()
+        print(f"📚 {stats['runs']} runs, {stats['domains']} domains, {stats['endpoints']} endpoints in {args.index}")
+    elif args.command == 'rebuild':
+        if not os.path.isdir(args.results_dir):
+            print(f"❌ {args.results_dir} not found")
+            sys.exit(1)
+        indexed, skipped = index.rebuild(args.results_dir)
+        print(f"📚 Indexed {indexed} result files" + (f" ({skipped} skipped)" if skipped else ""))
+    elif args.command == 'merge':
+        for source in args.sources:
+            try:
+                print(f"📚 Merged {index.merge(source, args.prefix)} runs from {source}")
+            except (OSError, sqlite3.Error) as e:
+                print(f"❌ Could not merge {source}: {e}")
+                sys.exit(1)
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
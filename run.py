@@ -3,6 +3,9 @@ import os
 import subprocess
 import sys
 
+from results_index import ResultsIndex
+from service import ServiceClient, ServiceError, submit_and_follow
+
 def clear_screen():
     os.system('clear' if os.name != 'nt' else 'cls')
 
@@ -27,10 +30,24 @@ This powerful tool helps you:
   [2] 🔍 Scrape a Website (headless mode - faster)
   [3] 📁 View Previous Results
   [4] ℹ️  Help & Examples
-  [5] 🚪 Exit
+  [5] 🛰️  Start Scraper Service (keeps browsers warm for faster scrapes)
+  [6] 🚪 Exit
 
 """)
 
+def run_scrape(url, headless):
+    """Hand the scrape to a running service if there is one, otherwise run scraper.py"""
+    client = ServiceClient.connect()
+    if client:
+        print(f"🛰️  Using the scrape service at {client.address}\n")
+        try:
+            submit_and_follow(client, url, show_browser=not headless)
+            return
+        except (OSError, ServiceError) as e:
+            print(f"⚠️  Scrape service stopped responding ({e}), scraping here instead\n")
+    
+    subprocess.run([sys.executable, "scraper.py", url] + (["--headless"] if headless else []))
+
 def scrape_with_browser():
     clear_screen()
     print("╔════════════════════════════════════════════════════════════════════════════╗")
@@ -50,7 +67,7 @@ def scrape_with_browser():
     print(f"\n🚀 Starting scrape of: {url}")
     print("📺 Browser window will open - please wait...\n")
     
-    subprocess.run([sys.executable, "scraper.py", url])
+    run_scrape(url, headless=False)
     
     input("\n\n✅ Press Enter to return to menu...")
 
@@ -73,7 +90,7 @@ def scrape_headless():
     print(f"\n🚀 Starting headless scrape of: {url}")
     print("⚡ Running in background (faster)...\n")
     
-    subprocess.run([sys.executable, "scraper.py", url, "--headless"])
+    run_scrape(url, headless=True)
     
     input("\n\n✅ Press Enter to return to menu...")
 
@@ -88,29 +105,60 @@ def view_results():
         input("Press Enter to continue...")
         return
     
-    files = os.listdir('scrape_results')
+    index = ResultsIndex()
+    if not index.stats()['runs']:
+        # Results saved before the index existed
+        index.rebuild()
+    stats = index.stats()
     
-    if not files:
+    if not stats['runs']:
         print("📭 No scraping results saved yet.\n")
         input("Press Enter to continue...")
         return
     
-    api_files = [f for f in files if f.endswith('_apis.txt')]
-    json_files = [f for f in files if f.endswith('.json')]
-    
-    print(f"📊 Total files saved: {len(files)}\n")
-    print(f"   • API endpoint files: {len(api_files)}")
-    print(f"   • Complete data files: {len(json_files)}")
-    print(f"   • HTML files: {len([f for f in files if f.endswith('.html')])}\n")
+    print(f"📊 Saved runs: {stats['runs']}\n")
+    print(f"   • Domains scraped: {stats['domains']}")
+    print(f"   • API endpoints recorded: {stats['endpoints']}\n")
     
-    if api_files:
-        print("Latest API discoveries:\n")
-        for f in sorted(api_files, reverse=True)[:5]:
-            print(f"   📄 {f}")
+    print("Latest runs:\n")
+    for run in index.runs(limit=5):
+        print(f"   📄 {run['timestamp']}  {run['domain']}  ({run['endpoint_count']} APIs)  {run['result_file']}")
     
     print(f"\n💡 All files are in the 'scrape_results' folder")
     
-    input("\n\nPress Enter to continue...")
+    search = input("\n🔎 Search endpoints by URL words or a status code like 500 (Enter to skip): ").strip()
+    while search:
+        status = int(search) if search.isdigit() else None
+        matches = index.find_endpoints(status=status, search=None if status else search, limit=20)
+        print()
+        for row in matches:
+            print(f"   {row['timestamp']}  {row['status']}  {row['method']} {row['url']}")
+            print(f"      {row['result_file']}")
+        print(f"\n   {len(matches)} matches" + (" (showing the latest 20)" if len(matches) == 20 else ""))
+        search = input("\n🔎 Search again (Enter to go back): ").strip()
+    index.close()
+
+def start_service():
+    clear_screen()
+    print("╔════════════════════════════════════════════════════════════════════════════╗")
+    print("║                        🛰️  SCRAPER SERVICE                                  ║")
+    print("╚════════════════════════════════════════════════════════════════════════════╝\n")
+    
+    client = ServiceClient.connect()
+    if client:
+        health = client.health()
+        print(f"✅ A service is already running at {client.address} (pid {health['pid']})")
+        print(f"   • Queued jobs: {health['queued']}, running: {health['running']}\n")
+        input("Press Enter to continue...")
+        return
+    
+    print("💡 Keep this window open. Scrapes started from another run.py window, the GUI")
+    print("   or 'python scraper.py --submit URL' will use its warm browsers.\n")
+    try:
+        subprocess.run([sys.executable, "scraper.py", "--serve", "--workers", "2"])
+    except KeyboardInterrupt:
+        pass
+    input("\nPress Enter to return to menu...")
 
 def show_help():
     clear_screen()
@@ -167,7 +215,7 @@ After scraping, you'll find these files in the 'scrape_results' folder:
 def main():
     while True:
         show_menu()
-        choice = input("Select an option (1-5): ").strip()
+        choice = input("Select an option (1-6): ").strip()
         
         if choice == '1':
             scrape_with_browser()
@@ -178,11 +226,13 @@ def main():
         elif choice == '4':
             show_help()
         elif choice == '5':
+            start_service()
+        elif choice == '6':
             clear_screen()
             print("\n👋 Thanks for using Web Scraper & API Discovery Tool!\n")
             sys.exit(0)
         else:
-            print("\n❌ Invalid option. Please choose 1-5.")
+            print("\n❌ Invalid option. Please choose 1-6.")
             input("Press Enter to continue...")
 
 if __name__ == "__main__":
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Incremental/diff mode: compare a scrape with the previous run of the same domain.
+
+Each run in diff mode writes a compact index (endpoint status and body hash,
+plus the set of request URLs) to scrape_results/run_index/{domain}/. The next
+run loads only that index, not the previous full result file, and reports
+new, removed and changed API endpoints and request URLs.
+"""
+import hashlib
+import json
+import os
+
+from bodies import inline_body
+
+INDEX_DIR = os.path.join('scrape_results', 'run_index')
+
+
+def endpoint_digest(endpoint):
+    """sha256 of an endpoint's body, from the record, the inline body or its side file"""
+    if endpoint.get('body_sha256'):
+        return endpoint['body_sha256']
+    if endpoint.get('body_blob'):
+        # Blobs are named by the sha256 of the body
+        return endpoint['body_blob']
+    if endpoint.get('body') is not None:
+        # Result files hold binary bodies as base64; hash the bytes that were captured
+        return hashlib.sha256(inline_body(endpoint)).hexdigest()
+    if endpoint.get('body_file'):
+        h = hashlib.sha256()
+        with open(endpoint['body_file'], 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(chunk)
+        return h.hexdigest()
+    return None
+
+
+def build_run_index(scrape_info, result_file, api_endpoints, request_keys):
+    endpoints = {}
+    for endpoint in api_endpoints:
+        endpoints[f"{endpoint['method']} {endpoint['url']}"] = {
+            'status': endpoint['status'],
+            'content_type': endpoint['content_type'],
+            'body_sha256': endpoint_digest(endpoint)
+        }
+    return {
+        'timestamp': scrape_info['timestamp'],
+        'target_url': scrape_info['target_url'],
+        'result_file': result_file,
+        'endpoints': endpoints,
+        'requests': sorted(request_keys)
+    }
+
+
+def _domain_dir(domain):
+    return os.path.join(INDEX_DIR, domain)
+
+
+def find_previous_index(domain):
+    """Load the most recent run index for a domain, or None if there is none"""
+    try:
+        names = sorted(n for n in os.listdir(_domain_dir(domain)) if n.endswith('.json'))
+    except FileNotFoundError:
+        return None
+    if not names:
+        return None
+    with open(os.path.join(_domain_dir(domain), names[-1]), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_run_index(domain, run_name, index):
+    os.makedirs(_domain_dir(domain), exist_ok=True)
+    path = os.path.join(_domain_dir(domain), f"{run_name}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+    return path
+
+
+def diff_indexes(previous, current):
+    before, after = previous['endpoints'], current['endpoints']
+    changed = []
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        if old['status'] != new['status'] or (
+                old['body_sha256'] and new['body_sha256'] and old['body_sha256'] != new['body_sha256']):
+            changed.append({'endpoint': key, 'before': old, 'after': new})
+
+    old_requests, new_requests = set(previous['requests']), set(current['requests'])
+    return {
+        'previous_run': previous['result_file'],
+        'previous_timestamp': previous['timestamp'],
+        'current_run': current['result_file'],
+        'current_timestamp': current['timestamp'],
+        'endpoints': {
+            'new': sorted(after.keys() - before.keys()),
+            'removed': sorted(before.keys() - after.keys()),
+            'changed': changed
+        },
+        'requests': {
+            'new': sorted(new_requests - old_requests),
+            'removed': sorted(old_requests - new_requests)
+        }
+    }
@@ -1,24 +1,141 @@
 #!/usr/bin/env python3
+import argparse
 import json
 import sys
-from seleniumwire import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from datetime import datetime
 from urllib.parse import urlparse
 import os
-import time
 import shutil
 import subprocess
+import atexit
+import queue
+import threading
+import hashlib
+import sqlite3
+import time
+from blobstore import BlobStore
+from bodies import preview_body, response_body, response_body_prefix, serializable_body
+from classifier import SNIFF_BYTES, ApiClassifier
+from endpoint_groups import EndpointGroups, format_statuses
+from cancellation import CancelToken, ScrapeCancelled
+from capture import RESOURCE_TYPES, CaptureConfig
+from metrics import ScrapeMetrics
+from records import HeaderTable, RequestRecord, ResponseRecord
+from response_cache import DEFAULT_CACHE_FILE, ResponseCache
+from results_index import ResultsIndex
+from streaming import StreamingCapture
+from scrape_diff import build_run_index, diff_indexes, find_previous_index, save_run_index
+from waits import WAIT_STRATEGIES, wait_for_page
+from writers import DEFAULT_INLINE_BODY_LIMIT, NdjsonResultWriter, iter_records, read_body_excerpt
+
+DISCOVERY_CACHE_FILE = os.environ.get('SCRAPER_DISCOVERY_CACHE') or os.path.join(
+    os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'web-scraper-pro', 'discovery.json'
+)
+
+_discovered = {}
+_discovery_lock = threading.Lock()
+
+
+def _load_discovery_cache():
+    try:
+        with open(DISCOVERY_CACHE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_discovery_cache(cache):
+    try:
+        os.makedirs(os.path.dirname(DISCOVERY_CACHE_FILE), exist_ok=True)
+        tmp_file = f"{DISCOVERY_CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_file, DISCOVERY_CACHE_FILE)
+    except OSError:
+        pass
+
+
+def cached_discovery(name, env_var, discover):
+    """Return a binary path from the env override, the in-process memo, the on-disk cache, or discover()
+    
+    Cache entries are keyed by PATH and dropped when the cached binary no longer exists.
+    """
+    override = os.environ.get(env_var)
+    if override:
+        return override
+    
+    key = f"{name}:{hashlib.sha256(os.environ.get('PATH', '').encode()).hexdigest()[:16]}"
+    with _discovery_lock:
+        if key in _discovered and (_discovered[key] is None or os.path.isfile(_discovered[key])):
+            return _discovered[key]
+        
+        cache = _load_discovery_cache()
+        path = cache.get(key)
+        if path and os.path.isfile(path):
+            _discovered[key] = path
+            return path
+        
+        path = discover()
+        _discovered[key] = path
+        if path:
+            cache[key] = path
+        else:
+            cache.pop(key, None)
+        _save_discovery_cache(cache)
+        return path
+
 
 class WebScraper:
-    def __init__(self):
+    def __init__(self, pool=None, wait='network-idle', wait_timeout=15, wait_options=None,
+                 output_format='json', inline_body_limit=DEFAULT_INLINE_BODY_LIMIT, capture=None,
+                 response_cache=None, diff=False, browser_args=(), statsd=None, mode='browser',
+                 blob_store=None, results_index=None, classifier=None, stream=False):
         self.api_endpoints = []
+        # Counts, status mixes and one sample per group; the only endpoint data kept when streaming to a writer
+        self.endpoint_groups = EndpointGroups()
         self.all_requests = []
+        self.request_count = 0
+        self.domains = set()
+        # scheme://host of every captured request, so a pooled browser can clear storage for all of them
+        self.origins = set()
         self.page_content = {}
+        self.scrape_info = {}
+        self.result_file = None
         self.gui_log = None
+        self.verbose = True
+        self.pool = pool
+        self.wait = wait
+        self.wait_timeout = wait_timeout
+        self.wait_options = wait_options or {}
+        self.output_format = output_format
+        self.inline_body_limit = inline_body_limit
+        self.capture = capture
+        self.response_cache = response_cache
+        self.diff = diff
+        self.browser_args = tuple(browser_args)
+        self.metrics = ScrapeMetrics()
+        self.statsd = statsd
+        self.mode = mode
+        self.blob_store = blob_store
+        self.results_index = results_index
+        self.classifier = classifier or ApiClassifier()
+        self.stream = stream
+        self._blob_bytes = 0
+        self.header_table = HeaderTable()
+        self._request_keys = set()
+        self.writer = None
+        self.cancel_token = CancelToken()
     
     def _find_chromium_binary(self):
+        """Find Chromium/Chrome, honouring SCRAPER_CHROMIUM_BINARY and the discovery cache"""
+        return cached_discovery('chromium', 'SCRAPER_CHROMIUM_BINARY', self._discover_chromium_binary)
+    
+    def _find_chromedriver(self):
+        """Find chromedriver, honouring SCRAPER_CHROMEDRIVER and the discovery cache"""
+        return cached_discovery('chromedriver', 'SCRAPER_CHROMEDRIVER', self._discover_chromedriver)
+    
+    def _discover_chromium_binary(self):
         """Dynamically find Chromium/Chrome binary"""
         possible_paths = [
             '/usr/bin/chromium',
@@ -51,7 +168,7 @@ class WebScraper:
         
         return None
     
-    def _find_chromedriver(self):
+    def _discover_chromedriver(self):
         """Dynamically find chromedriver"""
         driver_path = shutil.which('chromedriver')
         if driver_path:
@@ -69,16 +186,13 @@ class WebScraper:
         
         return None
         
-    def scrape(self, url, show_browser=True):
-        def log(msg):
-            if self.gui_log:
-                self.gui_log(msg)
-            else:
-                print(msg)
-        
-        log(f"\n{'='*80}")
-        log(f"🔍 Starting scrape of: {url}")
-        log(f"{'='*80}\n")
+    def _create_driver(self, show_browser=True, log=print):
+        """Launch a new selenium-wire Chrome instance"""
+        # selenium-wire drags in selenium and its bundled mitmproxy (over half a second), so it is
+        # only imported once a browser is really needed, not for --help, the GUI or HTTP-only runs
+        from seleniumwire import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
         
         chrome_options = Options()
         
@@ -89,6 +203,8 @@ class WebScraper:
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--disable-gpu')
         chrome_options.add_argument('--window-size=1920,1080')
+        for arg in self.browser_args:
+            chrome_options.add_argument(arg)
         
         chromium_path = self._find_chromium_binary()
         if chromium_path:
@@ -97,69 +213,336 @@ class WebScraper:
         else:
             log(f"⚠️  Chromium binary not found, using system default")
         
+        log(f"📡 Starting browser...")
+        
+        chromedriver_path = self._find_chromedriver()
+        if chromedriver_path:
+            log(f"📍 Using ChromeDriver at: {chromedriver_path}")
+            service = Service(executable_path=chromedriver_path)
+            return webdriver.Chrome(service=service, options=chrome_options)
+        return webdriver.Chrome(options=chrome_options)
+        
+    def scrape(self, url, show_browser=True, cancel=None):
+        """Scrape one page; cancelling ``cancel`` (a CancelToken) closes its browser and raises ScrapeCancelled"""
+        def log(msg):
+            if self.gui_log:
+                self.gui_log(msg)
+            else:
+                print(msg)
+        
+        if cancel:
+            self.cancel_token = cancel
+        cancel = self.cancel_token
+        
+        log(f"\n{'='*80}")
+        log(f"🔍 Starting scrape of: {url}")
+        log(f"{'='*80}\n")
+        
+        started = time.perf_counter()
+        if self.mode in ('http', 'auto') and self._scrape_http(url, log):
+            self._finish_scrape(url, started, log)
+            return
+        
+        self.scrape_info['fetch_mode'] = 'browser'
         driver = None
+        release = None
+        unregister = None
+        stream = None
         try:
-            log(f"📡 Starting browser...")
+            cancel.raise_if_cancelled()
+            with self.metrics.phase('browser'):
+                if self.pool:
+                    driver = self.pool.acquire(log=log)
+                else:
+                    driver = self._create_driver(show_browser, log)
+                
+                # Stopping mid-page quits the browser from the cancelling thread, which makes
+                # whatever WebDriver call this thread is blocked in fail straight away
+                release = self._driver_release(driver)
+                unregister = cancel.on_cancel(lambda: release(discard=True))
+                cancel.raise_if_cancelled()
+                
+                if self.capture:
+                    self.capture.apply(driver)
             
-            chromedriver_path = self._find_chromedriver()
-            if chromedriver_path:
-                log(f"📍 Using ChromeDriver at: {chromedriver_path}")
-                service = Service(executable_path=chromedriver_path)
-                driver = webdriver.Chrome(service=service, options=chrome_options)
-            else:
-                driver = webdriver.Chrome(options=chrome_options)
+            if self.stream:
+                # Records are written while the page loads, so the writer has to exist first
+                if self.output_format == 'ndjson':
+                    self.writer = self._open_stream_writer(url)
+                stream = StreamingCapture(self._capture, cancel=cancel,
+                                          flush=self.writer.flush if self.writer else None)
+                stream.start(driver)
             
+            cancel.raise_if_cancelled()
             log(f"📡 Loading page...")
-            driver.get(url)
-            
-            time.sleep(5)
+            with self.metrics.phase('navigate'):
+                driver.get(url)
             
-            log(f"✅ Page loaded successfully!\n")
+            cancel.raise_if_cancelled()
+            with self.metrics.phase('wait'):
+                self.scrape_info['wait'] = wait_for_page(driver, self.wait, self.wait_timeout, cancel=cancel,
+                                                         traffic=stream.traffic if stream else None,
+                                                         **self.wait_options)
+            if self.scrape_info['wait']['timed_out']:
+                log(f"⏱️  Wait strategy '{self.wait}' hit the {self.wait_timeout}s cap, continuing anyway")
             
-            self.page_content = {
-                'title': driver.title,
-                'url': driver.current_url,
-                'html': driver.page_source
-            }
+            log(f"✅ Page loaded successfully! (waited {self.scrape_info['wait']['waited_s']}s)\n")
             
-            for request in driver.requests:
-                request_data = {
-                    'url': request.url,
-                    'method': request.method,
-                    'headers': dict(request.headers),
-                    'type': 'request'
+            cancel.raise_if_cancelled()
+            with self.metrics.phase('page_content'):
+                self.page_content = {
+                    'title': driver.title,
+                    'url': driver.current_url,
+                    'html': driver.page_source
                 }
-                self.all_requests.append(request_data)
-                
-                if request.response:
-                    content_type = request.response.headers.get('Content-Type', '').lower()
-                    
-                    response_data = {
-                        'url': request.url,
-                        'method': request.method,
-                        'status': request.response.status_code,
-                        'content_type': content_type,
-                        'headers': dict(request.response.headers),
-                        'type': 'response'
-                    }
+            
+            cancel.raise_if_cancelled()
+            with self.metrics.phase('capture'):
+                if stream:
+                    stream.stop()
+                    log(f"📥 Streamed {stream.captured} requests while the page loaded")
+                else:
+                    if self.output_format == 'ndjson':
+                        self.writer = self._open_stream_writer(url)
                     
-                    if 'application/json' in content_type or '/api/' in request.url or 'graphql' in request.url.lower():
-                        try:
-                            body = request.response.body.decode('utf-8')
-                            response_data['body'] = body
-                            self.api_endpoints.append(response_data)
-                        except:
-                            pass
+                    for request in driver.requests:
+                        cancel.raise_if_cancelled()
+                        self._capture(request)
+                self.metrics.incr('requests_captured', self.request_count)
+                self.metrics.incr('endpoints_found', self.endpoint_groups.count)
+                
+                if self.response_cache:
+                    self.response_cache.evict()
             
         except Exception as e:
+            if stream:
+                stream.abort()
+            self._discard_output()
+            if cancel.cancelled:
+                log(f"⏹  Scrape cancelled")
+                if isinstance(e, ScrapeCancelled):
+                    raise
+                # The browser was quit underneath a WebDriver call; report that as the cancellation
+                raise ScrapeCancelled("Scrape cancelled") from e
             log(f"⚠️  Error: {e}")
             raise
         finally:
-            if driver:
-                driver.quit()
+            if unregister:
+                unregister()
+            if release:
+                with self.metrics.phase('release'):
+                    release(discard=cancel.cancelled)
+        
+        self._finish_scrape(url, started, log)
+    
+    def _driver_release(self, driver):
+        """Return a release(discard=False) function that gives the driver back exactly once"""
+        lock = threading.Lock()
+        released = []
+        
+        def release(discard=False):
+            with lock:
+                if released:
+                    return
+                released.append(True)
+            if self.pool:
+                self.pool.release(driver, discard=discard, origins=self.origins)
+            else:
+                try:
+                    driver.quit()
+                except Exception:
+                    if not discard:
+                        raise
+        
+        return release
+    
+    def _scrape_http(self, url, log):
+        """Fetch the page without a browser; returns False when auto mode should fall back to one"""
+        from http_fetch import fetch, looks_js_rendered, page_title
+        
+        self.cancel_token.raise_if_cancelled()
+        log(f"⚡ Fetching over plain HTTP...")
+        try:
+            with self.metrics.phase('http_fetch'):
+                response, captured = fetch(url, timeout=self.wait_timeout)
+        except Exception as e:
+            if self.mode == 'http':
+                log(f"⚠️  Error: {e}")
+                raise
+            log(f"⚠️  HTTP fetch failed ({e}), falling back to the browser")
+            return False
+        self.cancel_token.raise_if_cancelled()
+        
+        is_html = 'html' in response.headers.get('Content-Type', '').lower()
+        if self.mode == 'auto':
+            if not response.ok:
+                log(f"↪️  HTTP fetch returned {response.status_code}, falling back to the browser")
+                return False
+            if is_html and looks_js_rendered(response.text):
+                log(f"🧠 Page looks JavaScript-rendered, falling back to the browser")
+                return False
+        
+        log(f"✅ Fetched without a browser! ({response.status_code}, {len(response.content)} bytes)\n")
+        self.scrape_info['fetch_mode'] = 'http'
+        self.page_content = {
+            'title': page_title(response.text) if is_html else '',
+            'url': response.url,
+            'html': response.text if is_html else ''
+        }
         
-        self._analyze_results()
-        self._save_results(url)
+        self._capture_all(url, captured, log)
+        return True
+    
+    def _capture_all(self, url, captured, log):
+        """Record requests that didn't come from a browser (HTTP fetches, replays)"""
+        try:
+            with self.metrics.phase('capture'):
+                if self.output_format == 'ndjson':
+                    self.writer = self._open_stream_writer(url)
+                
+                for request in captured:
+                    self.cancel_token.raise_if_cancelled()
+                    self._capture(request)
+                self.metrics.incr('requests_captured', self.request_count)
+                self.metrics.incr('endpoints_found', self.endpoint_groups.count)
+                
+                if self.response_cache:
+                    self.response_cache.evict()
+        except Exception as e:
+            self._discard_output()
+            log(f"⏹  Scrape cancelled" if isinstance(e, ScrapeCancelled) else f"⚠️  Error: {e}")
+            raise
+    
+    def _finish_scrape(self, url, started, log):
+        # Last point to back out; once saving starts the run is completed as a whole
+        if self.cancel_token.cancelled:
+            self._discard_output()
+            log(f"⏹  Scrape cancelled")
+            self.cancel_token.raise_if_cancelled()
+        if self.verbose:
+            with self.metrics.phase('analyze'):
+                self._analyze_results()
+        with self.metrics.phase('save'):
+            self._save_results(url)
+        self.metrics.phases['total'] = round(time.perf_counter() - started, 4)
+        
+        if self.statsd:
+            try:
+                self.metrics.send_statsd(self.statsd)
+            except OSError as e:
+                log(f"⚠️  Could not send metrics to StatsD at {self.statsd}: {e}")
+    
+    def _discard_output(self):
+        """Delete a streamed run's partial files and its reserved name so it isn't indexed as a real run"""
+        if not self.writer:
+            return
+        self.writer.discard()
+        try:
+            os.remove(f"{self.writer.base}_apis.txt")
+        except FileNotFoundError:
+            pass
+        self.writer = None
+    
+    def _capture(self, request):
+        """Record one request and, if it looks like an API call, its response"""
+        request_data = RequestRecord(request.url, request.method, self._headers(request.headers))
+        self.request_count += 1
+        parts = urlparse(request.url)
+        if parts.netloc:
+            self.domains.add(parts.netloc)
+            self.origins.add(f"{parts.scheme}://{parts.netloc}")
+        
+        if self.diff:
+            self._request_keys.add(f"{request.method} {request.url}")
+        
+        if self.writer:
+            self.writer.write(request_data)
+        else:
+            self.all_requests.append(request_data)
+        
+        if request.response:
+            content_type = request.response.headers.get('Content-Type', '').lower()
+            if not self.writer:
+                content_type = self.header_table.value(content_type)
+            if request.response.body:
+                self.metrics.incr('bytes_buffered', len(request.response.body))
+            
+            body = None
+            # Decoding never shrinks a body, so one already over --max-body-size as captured
+            # is skipped without paying to decompress it
+            too_large = self.capture and self.capture.body_too_large(request.response.body)
+            
+            def decoded_body():
+                # Content-Encoding is only undone for bodies a rule sniffs or that turn out to be APIs
+                nonlocal body
+                if body is None:
+                    body = response_body(request.response)
+                return body
+            
+            def body_prefix():
+                if too_large:
+                    return response_body_prefix(request.response, SNIFF_BYTES)
+                return decoded_body()
+            
+            rule = self.classifier.classify(request.url, content_type, body_prefix)
+            if rule:
+                response_data = ResponseRecord(request.url, request.method, request.response.status_code,
+                                               content_type, self._headers(request.response.headers))
+                response_data['matched_rule'] = rule
+                if not too_large:
+                    too_large = self.capture and self.capture.body_too_large(decoded_body())
+                
+                if too_large:
+                    # The decoded size when it was decoded, otherwise the size as transferred
+                    response_data['body_size'] = len(body if body is not None else request.response.body)
+                    response_data['body_truncated'] = True
+                elif self.response_cache:
+                    # Bodies the user asked to drop are neither hashed nor stored in the cache
+                    response_data['cache'], response_data['body_sha256'] = self.response_cache.check(
+                        request.method, request.url, request.headers, response_data['status'],
+                        request.response.headers, body, request.body
+                    )
+                
+                # Bodies identical to the cached copy are referenced by hash instead of re-serialized
+                if too_large or response_data.get('cache') == 'unchanged':
+                    if self.writer:
+                        self.writer.write(response_data)
+                    self._add_endpoint(response_data)
+                    return
+                
+                # Kept as bytes; only turned into text when written out or previewed
+                if self.writer:
+                    self.writer.write_response(response_data, body)
+                else:
+                    response_data['body'] = body
+                self._add_endpoint(response_data)
+    
+    def _headers(self, headers):
+        # Records handed to a writer are dropped once written, so interning their headers would only
+        # keep every Date, ETag and request id seen until the scrape ends
+        if self.writer:
+            return tuple(dict(headers).items())
+        return self.header_table.intern(headers)
+    
+    def _add_endpoint(self, record):
+        # Once a record is on disk only its group summary (and the group's sample) stays in memory,
+        # so long-lived and polling pages don't grow the scrape with every response
+        self.endpoint_groups.add(record)
+        if not self.writer:
+            self.api_endpoints.append(record)
+    
+    def _open_stream_writer(self, original_url):
+        """Start streaming records to {domain}_{timestamp}.ndjson before capture begins"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        domain = urlparse(original_url).netloc.replace('.', '_')
+        
+        os.makedirs('scrape_results', exist_ok=True)
+        base = self._claim_output_base(domain, timestamp)
+        
+        return NdjsonResultWriter(base, {
+            'timestamp': timestamp,
+            'target_url': original_url
+        }, self.inline_body_limit, self.blob_store)
     
     def _analyze_results(self):
         print(f"\n{'='*80}")
@@ -168,36 +551,44 @@ class WebScraper:
         
         print(f"📄 Page Title: {self.page_content.get('title', 'N/A')}")
         print(f"🔗 Final URL: {self.page_content.get('url', 'N/A')}")
-        print(f"📦 Total Requests Captured: {len(self.all_requests)}")
-        print(f"🎯 API Endpoints Found: {len(self.api_endpoints)}\n")
+        print(f"📦 Total Requests Captured: {self.request_count}")
+        groups = self.endpoint_groups.groups()
+        print(f"🎯 API Endpoints Found: {self.endpoint_groups.count} ({len(groups)} unique)\n")
         
-        if self.api_endpoints:
+        if groups:
             print(f"{'='*80}")
             print(f"🔥 DISCOVERED API ENDPOINTS:")
             print(f"{'='*80}\n")
             
-            for idx, endpoint in enumerate(self.api_endpoints, 1):
-                print(f"[{idx}] {endpoint['method']} {endpoint['url']}")
-                print(f"    Status: {endpoint['status']}")
+            for idx, group in enumerate(groups, 1):
+                endpoint = self.endpoint_groups.sample(group)
+                if group['count'] > 1:
+                    print(f"[{idx}] {group['method']} {group['template']}  (×{group['count']})")
+                    print(f"    Sample: {endpoint['url']}")
+                else:
+                    print(f"[{idx}] {endpoint['method']} {endpoint['url']}")
+                print(f"    Status: {format_statuses(group['statuses'])}")
                 print(f"    Content-Type: {endpoint['content_type']}")
                 
                 if endpoint.get('body'):
-                    try:
-                        body_json = json.loads(endpoint['body'])
-                        body_preview = json.dumps(body_json, indent=2)[:500]
+                    body_preview, is_json = preview_body(endpoint['body'], 500)
+                    if is_json:
                         print(f"    Response Preview:\n{body_preview}...")
-                    except:
-                        body_preview = endpoint['body'][:200]
-                        print(f"    Response Preview: {body_preview}...")
+                    else:
+                        print(f"    Response Preview: {body_preview[:200]}...")
+                elif endpoint.get('body_file'):
+                    print(f"    Response: {endpoint['body_size']} bytes in {endpoint['body_file']}")
+                elif endpoint.get('body_blob'):
+                    print(f"    Response: {endpoint['body_size']} bytes in blob {endpoint['body_blob'][:12]}")
+                elif endpoint.get('body_truncated'):
+                    print(f"    Response: {endpoint['body_size']} bytes (over --max-body-size, not kept)")
+                elif endpoint.get('cache') == 'unchanged':
+                    print(f"    Response: unchanged since last scrape (sha256 {endpoint['body_sha256'][:12]})")
                 print()
         else:
             print("ℹ️  No API endpoints detected (this website might not use AJAX/API calls)")
         
-        unique_domains = set()
-        for req in self.all_requests:
-            domain = urlparse(req['url']).netloc
-            if domain:
-                unique_domains.add(domain)
+        unique_domains = self.domains
         
         print(f"\n🌐 Unique Domains Contacted: {len(unique_domains)}")
         for domain in sorted(unique_domains)[:10]:
@@ -206,52 +597,315 @@ class WebScraper:
             print(f"   ... and {len(unique_domains) - 10} more")
     
     def _save_results(self, original_url):
+        if self.writer:
+            return self._finish_stream(original_url)
+        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         domain = urlparse(original_url).netloc.replace('.', '_')
         
         os.makedirs('scrape_results', exist_ok=True)
+        base = self._claim_output_base(domain, timestamp)
         
         output = {
             'scrape_info': {
                 'timestamp': timestamp,
                 'target_url': original_url,
                 'final_url': self.page_content.get('url'),
-                'title': self.page_content.get('title')
+                'title': self.page_content.get('title'),
+                **self.scrape_info,
+                'metrics': self.metrics.to_dict()
             },
-            'api_endpoints': self.api_endpoints,
-            'all_requests': self.all_requests,
-            'page_html': self.page_content.get('html', '')
+            'endpoint_groups': self.endpoint_groups.groups(),
+            'api_endpoints': [self._output_endpoint(endpoint) for endpoint in self.api_endpoints],
+            'all_requests': self.all_requests
         }
         
-        json_file = f"scrape_results/{domain}_{timestamp}.json"
+        # With a blob store the HTML is kept once, compressed, instead of inline and in a .html file
+        if self.blob_store:
+            digest = self._put_blob(self.page_content.get('html', ''))
+            output['page_html_blob'] = digest
+            html_file = f"blob:{digest}"
+        else:
+            output['page_html'] = self.page_content.get('html', '')
+            html_file = f"{base}.html"
+            with open(html_file, 'w', encoding='utf-8') as f:
+                f.write(self.page_content.get('html', ''))
+        
+        json_file = f"{base}.json"
         with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+            json.dump(output, f, indent=2, ensure_ascii=False, default=dict)
         
-        html_file = f"scrape_results/{domain}_{timestamp}.html"
-        with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(self.page_content.get('html', ''))
+        return self._finish_results(original_url, base, timestamp, json_file, html_file)
+    
+    def _put_blob(self, data):
+        digest, written = self.blob_store.put(data)
+        self._blob_bytes += written
+        return digest
+    
+    def _output_endpoint(self, endpoint):
+        """JSON-safe copy of an endpoint, with its body moved to the blob store if one is in use"""
+        body = endpoint.get('body')
+        if not self.blob_store or not isinstance(body, (bytes, bytearray)):
+            return serializable_body(endpoint)
+        record = dict(endpoint)
+        del record['body']
+        record['body_blob'] = self._put_blob(body)
+        record['body_size'] = len(body)
+        return record
+    
+    def _finish_stream(self, original_url):
+        """Write the HTML side file and the summary line, then close the NDJSON stream"""
+        html_file = self.writer.write_html(self.page_content.get('html', ''))
+        json_file = self.writer.close({
+            'final_url': self.page_content.get('url'),
+            'title': self.page_content.get('title'),
+            **({'html_blob': html_file[len('blob:'):]} if html_file.startswith('blob:') else {'html_file': html_file}),
+            'request_count': self.request_count,
+            'api_endpoint_count': self.endpoint_groups.count,
+            'endpoint_groups': self.endpoint_groups.groups(),
+            **self.scrape_info,
+            'metrics': self.metrics.to_dict()
+        })
         
-        api_file = f"scrape_results/{domain}_{timestamp}_apis.txt"
+        return self._finish_results(original_url, self.writer.base, self.writer.scrape_info['timestamp'],
+                                    json_file, html_file)
+    
+    def _finish_results(self, original_url, base, timestamp, json_file, html_file):
+        """Write the API list (and the diff in diff mode) shared by both output formats, then report"""
+        api_file = f"{base}_apis.txt"
         with open(api_file, 'w', encoding='utf-8') as f:
             f.write(f"API Endpoints Discovered from: {original_url}\n")
             f.write(f"Scraped at: {timestamp}\n")
             f.write(f"{'='*80}\n\n")
             
-            for idx, endpoint in enumerate(self.api_endpoints, 1):
-                f.write(f"[{idx}] {endpoint['method']} {endpoint['url']}\n")
-                f.write(f"    Status: {endpoint['status']}\n")
+            for idx, group in enumerate(self.endpoint_groups.groups(), 1):
+                endpoint = self.endpoint_groups.sample(group)
+                if group['count'] > 1:
+                    f.write(f"[{idx}] {group['method']} {group['template']}  (×{group['count']})\n")
+                    f.write(f"    Sample: {endpoint['url']}\n")
+                else:
+                    f.write(f"[{idx}] {endpoint['method']} {endpoint['url']}\n")
+                f.write(f"    Status: {format_statuses(group['statuses'])}\n")
                 f.write(f"    Content-Type: {endpoint['content_type']}\n")
-                if endpoint.get('body'):
-                    f.write(f"    Response:\n{endpoint['body'][:1000]}\n")
+                if endpoint.get('body') or endpoint.get('body_file') or endpoint.get('body_blob'):
+                    f.write(f"    Response:\n{read_body_excerpt(endpoint, 1000, self.blob_store)}\n")
+                elif endpoint.get('cache') == 'unchanged':
+                    f.write(f"    Response: unchanged since last scrape (sha256 {endpoint['body_sha256']})\n")
                 f.write("\n" + "-"*80 + "\n\n")
         
+        self.result_file = json_file
+        diff_file = self._write_diff(original_url, base, timestamp, json_file) if self.diff else None
+        if self.results_index:
+            self._index_results(original_url, timestamp, json_file)
+        
+        written = [api_file, diff_file] + ([] if self.writer else [json_file, html_file])
+        self.metrics.incr('write_bytes', sum(os.path.getsize(path) for path in written
+                                             if path and not path.startswith('blob:')))
+        self.metrics.incr('write_bytes', self._blob_bytes)
+        if self.writer:
+            self.metrics.incr('write_bytes', self.writer.bytes_written)
+        if not self.verbose:
+            return json_file
+        
         print(f"\n{'='*80}")
         print(f"💾 RESULTS SAVED:")
         print(f"{'='*80}")
         print(f"📁 Complete Data: {json_file}")
         print(f"📄 HTML Content: {html_file}")
         print(f"🎯 API List: {api_file}")
+        if diff_file:
+            print(f"🔀 Changes Since Last Run: {diff_file}")
         print(f"{'='*80}\n")
+        return json_file
+    
+    def _index_results(self, original_url, timestamp, json_file):
+        try:
+            if self.writer:
+                # The records are only on disk; the index reads them back one line at a time
+                self.results_index.index_file(json_file)
+                return
+            self.results_index.add_run(json_file, {
+                'timestamp': timestamp,
+                'target_url': original_url,
+                'final_url': self.page_content.get('url'),
+                'title': self.page_content.get('title'),
+                'fetch_mode': self.scrape_info.get('fetch_mode'),
+                'request_count': self.request_count
+            }, self.api_endpoints)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            # The result files are already saved; a busy or broken index shouldn't fail the scrape
+            print(f"⚠️  Could not update the results index: {e}")
+    
+    def _write_diff(self, original_url, base, timestamp, json_file):
+        """Record this run's compact index and diff it against the previous run of the domain"""
+        domain = urlparse(original_url).netloc.replace('.', '_')
+        endpoints = iter_records(json_file, 'response') if self.writer else self.api_endpoints
+        current = build_run_index({'timestamp': timestamp, 'target_url': original_url}, json_file,
+                                  endpoints, self._request_keys)
+        previous = find_previous_index(domain)
+        save_run_index(domain, os.path.basename(base)[len(domain) + 1:], current)
+        
+        if previous is None:
+            if self.verbose:
+                print(f"\n🔀 No previous run of {urlparse(original_url).netloc} to diff against; baseline recorded")
+            return None
+        
+        changes = diff_indexes(previous, current)
+        diff_file = f"{base}_diff.json"
+        with open(diff_file, 'w', encoding='utf-8') as f:
+            json.dump(changes, f, indent=2, ensure_ascii=False)
+        
+        if self.verbose:
+            print(f"\n🔀 Changes since {previous['timestamp']}:")
+            print(f"   • API endpoints: {len(changes['endpoints']['new'])} new, "
+                  f"{len(changes['endpoints']['removed'])} removed, {len(changes['endpoints']['changed'])} changed")
+            print(f"   • Requests: {len(changes['requests']['new'])} new, {len(changes['requests']['removed'])} removed")
+        return diff_file
+    
+    def _claim_output_base(self, domain, timestamp):
+        """Reserve a unique output path so concurrent scrapes of one domain don't overwrite each other"""
+        base = f"scrape_results/{domain}_{timestamp}"
+        suffix = 1
+        while True:
+            try:
+                # The API list is written by every output format, so reserving it keeps a JSON and an
+                # NDJSON run from sharing a base (and each other's .html, _diff.json and run index)
+                os.close(os.open(f"{base}_apis.txt", os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return base
+            except FileExistsError:
+                suffix += 1
+                base = f"scrape_results/{domain}_{timestamp}_{suffix}"
+
+
+class BrowserPool:
+    """Keeps warm selenium-wire Chrome instances that scrapes check out and return.
+    
+    Browsers are reset between uses, recycled after ``max_pages`` pages or when
+    they stop responding, and all of them are shut down on interpreter exit.
+    """
+    def __init__(self, size=2, show_browser=False, max_pages=50, browser_args=()):
+        self.size = size
+        self.show_browser = show_browser
+        self.max_pages = max_pages
+        self.browser_args = tuple(browser_args)
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._pages = {}
+        self._closed = False
+        atexit.register(self.close)
+    
+    def acquire(self, timeout=None, log=print):
+        """Check out a browser, launching a new one if none are idle"""
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No browser available in the pool")
+        
+        try:
+            driver = self._idle.get_nowait()
+            log(f"♻️  Reusing warm browser from pool")
+        except queue.Empty:
+            try:
+                driver = WebScraper(browser_args=self.browser_args)._create_driver(self.show_browser, log)
+            except:
+                self._slots.release()
+                raise
+        
+        with self._lock:
+            self._pages[driver] = self._pages.get(driver, 0) + 1
+        return driver
+    
+    def release(self, driver, discard=False, origins=()):
+        """Return a browser to the pool, recycling it if worn out, unresponsive or ``discard`` is set.
+        
+        ``origins`` are the scheme://host origins the scrape loaded, whose storage is cleared.
+        """
+        try:
+            with self._lock:
+                worn_out = self._pages.get(driver, 0) >= self.max_pages
+            
+            if discard or self._closed or worn_out or not self._reset(driver, origins):
+                self._discard(driver)
+            else:
+                self._idle.put(driver)
+        finally:
+            self._slots.release()
+    
+    def _reset(self, driver, origins=()):
+        """Clear captured traffic, cookies, storage and the HTTP cache so the next scrape starts clean"""
+        try:
+            current = urlparse(driver.current_url)
+            origins = set(origins)
+            if current.scheme in ('http', 'https'):
+                origins.add(f"{current.scheme}://{current.netloc}")
+            for origin in sorted(origins):
+                if origin.startswith(('http://', 'https://')):
+                    driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            # Responses served from Chrome's disk cache never pass through selenium-wire, so a warm
+            # browser would silently miss cacheable API calls that a fresh one captures
+            driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+            CaptureConfig.reset(driver)
+            del driver.response_interceptor
+            driver.get('about:blank')
+            del driver.requests
+            return True
+        except:
+            return False
+    
+    def _discard(self, driver):
+        with self._lock:
+            self._pages.pop(driver, None)
+        try:
+            driver.quit()
+        except:
+            pass
+    
+    def discard_idle(self):
+        """Shut down the browsers nobody has checked out; returns how many"""
+        count = 0
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return count
+            self._discard(driver)
+            count += 1
+    
+    def close(self):
+        """Shut down every browser owned by the pool"""
+        self._closed = True
+        with self._lock:
+            drivers = list(self._pages)
+        for driver in drivers:
+            self._discard(driver)
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+def submit_to_service(address, url, show_browser, scraper_options):
+    """Run one scrape on a running service, echoing its log; returns the exit code"""
+    from service import DEFAULT_ADDRESS, JOB_OPTIONS, ServiceClient, ServiceError, submit_and_follow
+    
+    client = ServiceClient(address or DEFAULT_ADDRESS)
+    options = {key: scraper_options[key] for key in JOB_OPTIONS}
+    try:
+        job = submit_and_follow(client, url, show_browser=show_browser, **options)
+    except (OSError, ServiceError) as e:
+        print(f"❌ Could not reach the scrape service at {client.address}: {e}")
+        print("💡 Start one with: python scraper.py --serve")
+        return 1
+    return 0 if job['status'] == 'done' else 1
 
 
 def main():
@@ -267,9 +921,207 @@ def main():
 ╚════════════════════════════════════════════════════════════════════════════╝
     """)
     
-    if len(sys.argv) > 1:
-        url = sys.argv[1]
-        headless = '--headless' in sys.argv
+    parser = argparse.ArgumentParser(description="Scrape a website and discover its API endpoints")
+    parser.add_argument('url', nargs='?', help="URL to scrape")
+    parser.add_argument('--headless', action='store_true', help="run the browser without a window")
+    parser.add_argument('--mode', choices=['browser', 'http', 'auto'], default='browser',
+                        help="browser (default); http: plain HTTP fetch, no JavaScript; "
+                             "auto: try HTTP first and use the browser only if the page needs it")
+    parser.add_argument('--wait', choices=sorted(WAIT_STRATEGIES), default='network-idle',
+                        help="how to decide the page has settled (default: network-idle)")
+    parser.add_argument('--wait-timeout', type=float, default=15, help="hard cap on the wait in seconds (default: 15)")
+    parser.add_argument('--idle-ms', type=int, default=500, help="quiet period for network-idle in ms (default: 500)")
+    parser.add_argument('--max-inflight', type=int, default=0,
+                        help="requests network-idle lets stay unanswered, e.g. long-polls (default: 0)")
+    parser.add_argument('--selector', help="CSS selector to wait for (implies --wait selector)")
+    parser.add_argument('--sleep', type=float, default=5, help="seconds to sleep for --wait fixed (default: 5)")
+    parser.add_argument('--batch', metavar='FILE', help="scrape every URL in FILE, one per line ('-' reads stdin)")
+    parser.add_argument('--workers', type=int, default=4, help="concurrent browsers in batch mode (default: 4)")
+    parser.add_argument('--per-domain', type=int, default=2, help="max concurrent scrapes per domain in batch mode (default: 2)")
+    parser.add_argument('--processes', action='store_true', help="run batch workers as processes instead of threads")
+    parser.add_argument('--replay', metavar='RESULT_FILE',
+                        help="re-issue the API requests captured in a previous .json/.ndjson result without a browser "
+                             "(uses --workers concurrent requests)")
+    parser.add_argument('--rate', type=float, metavar='PER_SECOND', help="replay: max requests per second overall")
+    parser.add_argument('--every', type=float, metavar='SECONDS', help="replay: repeat every SECONDS until interrupted")
+    parser.add_argument('--crawl', action='store_true',
+                        help="follow same-origin links from the URL (uses --workers browsers, --per-domain per host)")
+    parser.add_argument('--max-depth', type=int, default=2, help="crawl: link depth to follow (default: 2)")
+    parser.add_argument('--max-pages', type=int, default=50, help="crawl: stop after this many pages (default: 50)")
+    parser.add_argument('--delay', type=float, default=1.0, help="crawl: seconds between requests to one host (default: 1)")
+    parser.add_argument('--bloom', action='store_true', help="crawl: dedupe with a Bloom filter instead of a set")
+    parser.add_argument('--ignore-robots', action='store_true', help="crawl: don't check robots.txt")
+    parser.add_argument('--output-format', choices=['json', 'ndjson'], default='json',
+                        help="json: one document (default); ndjson: stream records with large bodies in side files")
+    parser.add_argument('--stream', action='store_true',
+                        help="record traffic as it arrives instead of after the page settles; with --output-format "
+                             "ndjson memory stays flat on pages that never stop polling")
+    parser.add_argument('--blob-store', action='store_true',
+                        help="store bodies and HTML once, compressed and named by hash, in scrape_results/blobs")
+    parser.add_argument('--inline-body-limit', type=int, default=DEFAULT_INLINE_BODY_LIMIT,
+                        help="ndjson only: bodies larger than this many bytes go to side files")
+    parser.add_argument('--api-rules', metavar='FILE',
+                        help="JSON file of extra API detection rules (see classifier.py)")
+    parser.add_argument('--scope', action='append', metavar='REGEX',
+                        help="only capture URLs matching REGEX (repeatable); others are not buffered")
+    parser.add_argument('--block', metavar='TYPES',
+                        help=f"comma-separated resource types to block: {','.join(RESOURCE_TYPES)}")
+    parser.add_argument('--block-pattern', action='append', metavar='REGEX',
+                        help="abort requests whose URL matches REGEX, e.g. analytics beacons (repeatable)")
+    parser.add_argument('--max-body-size', type=int, metavar='BYTES',
+                        help="don't keep API response bodies larger than BYTES")
+    parser.add_argument('--response-cache', nargs='?', const=DEFAULT_CACHE_FILE, metavar='PATH',
+                        help=f"compare API responses with a persistent cache and skip unchanged bodies "
+                             f"(default path: {DEFAULT_CACHE_FILE})")
+    parser.add_argument('--cache-ttl', type=float, default=7 * 24, metavar='HOURS',
+                        help="drop cached responses not seen for this long (default: 168)")
+    parser.add_argument('--cache-max-mb', type=int, default=512, help="cap on cached body storage (default: 512)")
+    parser.add_argument('--no-index', action='store_true',
+                        help="don't record this run in scrape_results/index.sqlite (see results_index.py)")
+    parser.add_argument('--diff', action='store_true',
+                        help="compare with the previous run of the same domain and write only what changed")
+    parser.add_argument('--metrics-format', choices=['json', 'prometheus', 'statsd'],
+                        help="also print per-phase timings and counters in this format")
+    parser.add_argument('--metrics-file', metavar='PATH', help="write --metrics-format output to PATH instead of stdout")
+    parser.add_argument('--statsd', metavar='HOST:PORT', help="send metrics to a StatsD server over UDP after each scrape")
+    parser.add_argument('--serve', action='store_true',
+                        help="run as a long-lived service that keeps --workers warm browsers and takes scrape jobs "
+                             "over a local API (see service.py); the other flags become the defaults for every job")
+    parser.add_argument('--submit', action='store_true',
+                        help="hand the scrape to a running service instead of launching a browser here")
+    parser.add_argument('--service', metavar='ADDRESS',
+                        help="service address for --serve/--submit: http://host:port or unix:/path "
+                             "(default: $SCRAPER_SERVICE or http://127.0.0.1:8765)")
+    parser.add_argument('--node', metavar='QUEUE_FILE',
+                        help="scrape URLs leased from a shared work queue (see workqueue.py) with --workers browsers "
+                             "until it is drained; run one node per machine")
+    parser.add_argument('--lease', type=float, default=600, metavar='SECONDS',
+                        help="node: how long a leased URL stays reserved without a heartbeat (default: 600)")
+    parser.add_argument('--max-attempts', type=int, default=3,
+                        help="node: attempts before a URL is marked poison (default: 3)")
+    parser.add_argument('--chromium-binary', metavar='PATH', help="use this Chromium/Chrome binary and skip discovery")
+    parser.add_argument('--chromedriver', metavar='PATH', help="use this chromedriver and skip discovery")
+    args = parser.parse_args()
+    
+    # Set through the environment so batch worker processes inherit the overrides
+    if args.chromium_binary:
+        os.environ['SCRAPER_CHROMIUM_BINARY'] = args.chromium_binary
+    if args.chromedriver:
+        os.environ['SCRAPER_CHROMEDRIVER'] = args.chromedriver
+    
+    wait = 'selector' if args.selector else args.wait
+    wait_options = {
+        'fixed': {'seconds': args.sleep},
+        'network-idle': {'idle_ms': args.idle_ms, 'max_inflight': args.max_inflight},
+        'selector': {'selector': args.selector},
+    }.get(wait, {})
+    if wait == 'selector' and not args.selector:
+        parser.error("--wait selector requires --selector")
+    capture = None
+    if args.scope or args.block or args.block_pattern or args.max_body_size is not None:
+        try:
+            capture = CaptureConfig(
+                scopes=args.scope,
+                block_resources=[t.strip() for t in (args.block or '').split(',') if t.strip()],
+                block_patterns=args.block_pattern or (),
+                max_body_size=args.max_body_size
+            )
+        except ValueError as e:
+            parser.error(str(e))
+    
+    classifier = None
+    if args.api_rules:
+        try:
+            classifier = ApiClassifier.from_file(args.api_rules)
+        except (OSError, ValueError) as e:
+            parser.error(f"--api-rules: {e}")
+    
+    scraper_options = {
+        'wait': wait,
+        'wait_timeout': args.wait_timeout,
+        'wait_options': wait_options,
+        'output_format': args.output_format,
+        'inline_body_limit': args.inline_body_limit,
+        'capture': capture,
+        'response_cache': ResponseCache(args.response_cache, ttl=args.cache_ttl * 3600,
+                                        max_bytes=args.cache_max_mb * 1024 * 1024) if args.response_cache else None,
+        'diff': args.diff,
+        'statsd': args.statsd,
+        'mode': args.mode,
+        'stream': args.stream,
+        'blob_store': BlobStore() if args.blob_store else None,
+        'results_index': None if args.no_index else ResultsIndex(),
+        'classifier': classifier
+    }
+    
+    if args.serve:
+        from service import DEFAULT_ADDRESS, serve
+        
+        try:
+            serve(args.service or DEFAULT_ADDRESS, workers=args.workers, scraper_options=scraper_options)
+        except ValueError as e:
+            parser.error(str(e))
+        sys.exit(0)
+    
+    if args.batch:
+        from batch import print_summary, read_urls, run_batch
+        
+        urls = read_urls(args.batch)
+        print(f"🚀 Batch scraping {len(urls)} URLs with {args.workers} workers "
+              f"(max {args.per_domain} per domain)...\n")
+        summary = run_batch(urls, workers=args.workers, per_domain=args.per_domain,
+                            show_browser=not args.headless, use_processes=args.processes,
+                            scraper_options=scraper_options)
+        print_summary(summary)
+        sys.exit(1 if summary['failed'] else 0)
+    
+    if args.node:
+        from workqueue import Node, WorkQueue
+        
+        queue = WorkQueue(args.node, max_attempts=args.max_attempts)
+        counts = Node(queue, workers=args.workers, per_domain=args.per_domain, lease_s=args.lease,
+                      show_browser=not args.headless, scraper_options=scraper_options).run()
+        print(f"\n🛰️  Node finished: {counts['done']} done, {counts['retried']} retried, "
+              f"{counts['poisoned']} poisoned, {counts['lost']} lost to other nodes")
+        queue.close()
+        sys.exit(0)
+    
+    if args.replay:
+        from replay import replay
+        
+        try:
+            while True:
+                replay(args.replay, workers=args.workers, rate=args.rate, timeout=args.wait_timeout,
+                       scraper_options=scraper_options)
+                if not args.every:
+                    break
+                print(f"💤 Next replay in {args.every:g}s (Ctrl+C to stop)")
+                time.sleep(args.every)
+        except KeyboardInterrupt:
+            print("\n👋 Replay stopped")
+        sys.exit(0)
+    
+    if args.crawl:
+        if not args.url:
+            parser.error("--crawl requires a URL")
+        from crawler import Crawler, save_crawl_summary
+        
+        url = args.url if args.url.startswith(('http://', 'https://')) else 'https://' + args.url
+        print(f"🕸️  Crawling {url} (depth {args.max_depth}, max {args.max_pages} pages, "
+              f"{args.workers} browsers)...\n")
+        summary = Crawler(url, max_depth=args.max_depth, max_pages=args.max_pages, concurrency=args.workers,
+                          per_host=args.per_domain, delay=args.delay, show_browser=not args.headless,
+                          use_bloom=args.bloom, respect_robots=not args.ignore_robots,
+                          scraper_options=scraper_options, robots_timeout=args.wait_timeout).run()
+        path = save_crawl_summary(summary)
+        print(f"\n🕸️  Crawled {summary['pages_crawled']} pages ({summary['pages_failed']} failed), "
+              f"found {len(summary['api_endpoints'])} unique API endpoints")
+        print(f"📁 Crawl summary: {path}\n")
+        sys.exit(0)
+    
+    if args.url:
+        url = args.url
+        headless = args.headless
     else:
         url = input("🌐 Enter the URL to scrape (e.g., https://example.com): ").strip()
         
@@ -279,9 +1131,27 @@ def main():
     if not url.startswith(('http://', 'https://')):
         url = 'https://' + url
     
-    scraper = WebScraper()
+    if args.submit:
+        sys.exit(submit_to_service(args.service, url, not headless, scraper_options))
+    
+    scraper = WebScraper(**scraper_options)
     scraper.scrape(url, show_browser=not headless)
     
+    if args.metrics_format:
+        if args.metrics_format == 'prometheus':
+            text = scraper.metrics.to_prometheus({'domain': urlparse(url).netloc})
+        elif args.metrics_format == 'statsd':
+            text = "\n".join(scraper.metrics.to_statsd()) + "\n"
+        else:
+            text = json.dumps(scraper.metrics.to_dict(), indent=2) + "\n"
+        
+        if args.metrics_file:
+            with open(args.metrics_file, 'w', encoding='utf-8') as f:
+                f.write(text)
+            print(f"📈 Metrics written to {args.metrics_file}")
+        else:
+            print(text)
+    
     print("\n✨ Scraping complete! Check the 'scrape_results' folder for all saved files.\n")
 
 
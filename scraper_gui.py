@@ -7,10 +7,21 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
 import threading
 import os
-import json
+import sqlite3
 from datetime import datetime
-from queue import Queue
-from scraper import WebScraper
+from collections import deque
+from queue import Empty, Queue
+from cancellation import CancelToken, ScrapeCancelled
+from results_index import ResultsIndex
+from endpoint_groups import format_statuses
+from service import ServiceClient, ServiceError, job_result
+
+# The worker blocks once this many messages are waiting, so it can't outrun the UI
+MESSAGE_QUEUE_SIZE = 1000
+# Messages applied per UI tick, and the most lines the output box keeps (oldest are dropped)
+MAX_MESSAGES_PER_TICK = 500
+MAX_LOG_LINES = 5000
+TICK_MS = 100
 
 class ScraperGUI:
     def __init__(self, root):
@@ -29,7 +40,12 @@ class ScraperGUI:
         self.style.map('Dark.TButton', background=[('active', '#005a9e')])
         
         self.is_scraping = False
-        self.message_queue = Queue()
+        self.cancel_token = None
+        self._runs_thread = None
+        self.message_queue = Queue(maxsize=MESSAGE_QUEUE_SIZE)
+        self._main_thread_messages = deque()
+        self._status_lock = threading.Lock()
+        self._pending_status = None
         self.create_widgets()
         self.process_queue()
         
@@ -111,38 +127,74 @@ class ScraperGUI:
         self.log("📋 Enter a URL and click 'Start Scraping' to begin\n")
         
     def process_queue(self):
-        """Process messages from the worker thread safely on the main thread"""
-        from queue import Empty
-        try:
-            while True:
-                msg = self.message_queue.get_nowait()
-                msg_type = msg.get('type')
-                
-                if msg_type == 'log':
-                    self.output_text.insert(tk.END, msg['message'] + "\n")
-                    self.output_text.see(tk.END)
-                elif msg_type == 'status':
-                    self.status_bar.config(text=msg['message'])
-                elif msg_type == 'done':
-                    self.scrape_btn.config(state=tk.NORMAL)
-                    self.stop_btn.config(state=tk.DISABLED)
-                    self.is_scraping = False
-                elif msg_type == 'info_dialog':
-                    messagebox.showinfo(msg['title'], msg['message'])
-                elif msg_type == 'error_dialog':
-                    messagebox.showerror(msg['title'], msg['message'])
-        except Empty:
-            pass
-        
-        self.root.after(100, self.process_queue)
+        """Apply a batch of worker messages on the main thread: one text insert per tick, not one per line"""
+        lines = []
+        handled = 0
+        while handled < MAX_MESSAGES_PER_TICK:
+            if self._main_thread_messages:
+                msg = self._main_thread_messages.popleft()
+            else:
+                try:
+                    msg = self.message_queue.get_nowait()
+                except Empty:
+                    break
+            handled += 1
+            
+            if msg.get('type') == 'log':
+                lines.append(msg['message'])
+                continue
+            # Keep log output ahead of the dialog or state change that followed it
+            self._append_log(lines)
+            lines = []
+            self._handle_message(msg)
+        self._append_log(lines)
+        
+        with self._status_lock:
+            status, self._pending_status = self._pending_status, None
+        if status is not None:
+            self.status_bar.config(text=status)
+        
+        # Come back right away while there is a backlog, otherwise poll at the normal rate
+        backlog = self._main_thread_messages or not self.message_queue.empty()
+        self.root.after(1 if backlog else TICK_MS, self.process_queue)
+    
+    def _append_log(self, lines):
+        if not lines:
+            return
+        self.output_text.insert(tk.END, "\n".join(lines) + "\n")
+        # Ring buffer: drop the oldest lines once the box holds more than MAX_LOG_LINES
+        line_count = int(self.output_text.index('end-1c').split('.')[0])
+        if line_count > MAX_LOG_LINES:
+            self.output_text.delete('1.0', f"{line_count - MAX_LOG_LINES + 1}.0")
+        self.output_text.see(tk.END)
+    
+    def _handle_message(self, msg):
+        msg_type = msg.get('type')
+        if msg_type == 'done':
+            self.scrape_btn.config(state=tk.NORMAL)
+            self.stop_btn.config(state=tk.DISABLED)
+            self.is_scraping = False
+        elif msg_type == 'info_dialog':
+            messagebox.showinfo(msg['title'], msg['message'])
+        elif msg_type == 'error_dialog':
+            messagebox.showerror(msg['title'], msg['message'])
+    
+    def post(self, msg):
+        """Queue a message for the UI; worker threads block while the queue is full"""
+        if threading.current_thread() is threading.main_thread():
+            # The main thread drains the queue, so it must never wait on it
+            self._main_thread_messages.append(msg)
+        else:
+            self.message_queue.put(msg)
     
     def log(self, message):
         """Thread-safe logging"""
-        self.message_queue.put({'type': 'log', 'message': message})
+        self.post({'type': 'log', 'message': message})
         
     def update_status(self, message):
-        """Thread-safe status update"""
-        self.message_queue.put({'type': 'status', 'message': message})
+        """Thread-safe status update; only the latest status is shown at the next tick"""
+        with self._status_lock:
+            self._pending_status = message
         
     def start_scrape(self):
         url = self.url_entry.get().strip()
@@ -166,76 +218,137 @@ class ScraperGUI:
         self.log(f"{'='*80}\n")
         self.update_status("Scraping in progress...")
         
-        thread = threading.Thread(target=self.scrape_thread, args=(url,))
+        self.cancel_token = CancelToken()
+        thread = threading.Thread(target=self.scrape_thread, args=(url, self.cancel_token))
         thread.daemon = True
         thread.start()
         
-    def scrape_thread(self, url):
+    def scrape_thread(self, url, cancel):
         try:
-            scraper = WebScraper()
-            scraper.gui_log = self.log
-            
-            headless = self.headless_var.get()
-            scraper.scrape(url, show_browser=not headless)
+            show_browser = not self.headless_var.get()
+            client = ServiceClient.connect()
+            if client:
+                result = self.scrape_via_service(client, url, show_browser, cancel)
+            else:
+                # Deferred so the window opens without importing selenium-wire
+                from scraper import WebScraper
+                
+                index = ResultsIndex()
+                try:
+                    scraper = WebScraper(results_index=index)
+                    scraper.gui_log = self.log
+                    scraper.scrape(url, show_browser=show_browser, cancel=cancel)
+                    result = job_result(scraper)
+                finally:
+                    index.close()
             
             self.log(f"\n{'='*80}")
             self.log(f"📊 SCRAPING COMPLETED")
             self.log(f"{'='*80}\n")
-            self.log(f"📄 Page Title: {scraper.page_content.get('title', 'N/A')}")
-            self.log(f"🔗 Final URL: {scraper.page_content.get('url', 'N/A')}")
-            self.log(f"📦 Total Requests: {len(scraper.all_requests)}")
-            self.log(f"🎯 API Endpoints Found: {len(scraper.api_endpoints)}\n")
+            self.log(f"📄 Page Title: {result['title'] or 'N/A'}")
+            self.log(f"🔗 Final URL: {result['final_url'] or 'N/A'}")
+            self.log(f"📦 Total Requests: {result['request_count']}")
+            self.log(f"🎯 API Endpoints Found: {result['endpoint_count']}\n")
             
-            if scraper.api_endpoints:
+            if result['groups']:
                 self.log(f"{'='*80}")
                 self.log(f"🔥 DISCOVERED API ENDPOINTS:")
                 self.log(f"{'='*80}\n")
                 
-                for idx, endpoint in enumerate(scraper.api_endpoints, 1):
-                    self.log(f"[{idx}] {endpoint['method']} {endpoint['url']}")
-                    self.log(f"    Status: {endpoint['status']}")
-                    self.log(f"    Content-Type: {endpoint['content_type']}")
+                for idx, group in enumerate(result['groups'], 1):
+                    if group['count'] > 1:
+                        self.log(f"[{idx}] {group['method']} {group['template']}  (×{group['count']})")
+                    else:
+                        self.log(f"[{idx}] {group['method']} {group['sample_url']}")
+                    self.log(f"    Status: {format_statuses(group['statuses'])}")
+                    self.log(f"    Content-Type: {group['content_type']}")
                     
-                    if endpoint.get('body'):
-                        try:
-                            body_json = json.loads(endpoint['body'])
-                            body_preview = json.dumps(body_json, indent=2)[:300]
-                            self.log(f"    Response Preview:\n{body_preview}...\n")
-                        except:
-                            self.log(f"    Response: {endpoint['body'][:200]}...\n")
+                    if group.get('preview'):
+                        if group['preview_is_json']:
+                            self.log(f"    Response Preview:\n{group['preview']}...\n")
+                        else:
+                            self.log(f"    Response: {group['preview'][:200]}...\n")
             else:
                 self.log("ℹ️  No API endpoints detected\n")
             
             self.log("\n✅ Results saved to 'scrape_results' folder!")
             self.update_status("Scraping completed successfully!")
             
-            self.message_queue.put({
+            self.post({
                 'type': 'info_dialog',
                 'title': 'Success',
                 'message': (f"Scraping completed!\n\n"
-                           f"API Endpoints Found: {len(scraper.api_endpoints)}\n"
-                           f"Total Requests: {len(scraper.all_requests)}\n\n"
+                           f"API Endpoints Found: {result['endpoint_count']}\n"
+                           f"Total Requests: {result['request_count']}\n\n"
                            f"Results saved in 'scrape_results' folder.")
             })
             
+        except ScrapeCancelled:
+            self.log("\n⏹ Scrape stopped, browser closed\n")
+            self.update_status("Stopped")
         except Exception as e:
             self.log(f"\n❌ ERROR: {str(e)}\n")
             self.update_status("Scraping failed!")
-            self.message_queue.put({
+            self.post({
                 'type': 'error_dialog',
                 'title': 'Error',
                 'message': f"Scraping failed:\n{str(e)}"
             })
         finally:
-            self.message_queue.put({'type': 'done'})
+            self.post({'type': 'done'})
             
+    def scrape_via_service(self, client, url, show_browser, cancel):
+        """Run the scrape as a job on the background service and return its result summary"""
+        self.log(f"🛰️  Using the scrape service at {client.address}")
+        try:
+            job = client.submit(url, show_browser=show_browser)
+            unregister = cancel.on_cancel(lambda: client.cancel(job['id']))
+            try:
+                job = client.wait(job['id'], on_log=self.log)
+            finally:
+                unregister()
+        except (OSError, ServiceError) as e:
+            raise RuntimeError(f"Lost the scrape service at {client.address}: {e}")
+        
+        if job['status'] == 'cancelled':
+            raise ScrapeCancelled("Scrape cancelled")
+        if job['status'] != 'done':
+            raise RuntimeError(job['error'] or f"Job {job['id']} {job['status']}")
+        return job['result']
+    
     def stop_scrape(self):
-        self.is_scraping = False
+        if not self.cancel_token:
+            return
         self.log("\n⏹ Stopping scrape...\n")
-        self.update_status("Stopped")
-        self.scrape_btn.config(state=tk.NORMAL)
+        self.update_status("Stopping...")
         self.stop_btn.config(state=tk.DISABLED)
+        # Quitting the browser can take a few seconds, so do it off the UI thread;
+        # Start is re-enabled by the worker's 'done' message once it has actually exited
+        threading.Thread(target=self.cancel_token.cancel, daemon=True).start()
         
+    def show_recent_runs(self):
+        """Log the latest runs and recent server errors from the results index (runs on a worker thread)"""
+        index = ResultsIndex()
+        try:
+            if not index.stats()['runs']:
+                index.rebuild(log=self.log)
+            stats = index.stats()
+            self.log(f"\n📚 {stats['runs']} saved runs across {stats['domains']} domains "
+                     f"({stats['endpoints']} API endpoints indexed)")
+            for run in index.runs(limit=10):
+                self.log(f"   • {run['timestamp']}  {run['domain']}  {run['endpoint_count']} APIs")
+            
+            errors = index.find_endpoints(min_status=500, limit=5)
+            if errors:
+                self.log(f"\n🔥 Latest server errors:")
+                for row in errors:
+                    self.log(f"   • {row['timestamp']}  {row['status']}  {row['method']} {row['url']}")
+            self.log(f"\n💡 Search all runs with: python results_index.py find --help\n")
+        except (sqlite3.Error, OSError) as e:
+            self.log(f"⚠️  Could not read the results index: {e}")
+        finally:
+            index.close()
+    
     def open_results_folder(self):
         results_dir = os.path.join(os.getcwd(), 'scrape_results')
         
@@ -244,6 +357,10 @@ class ScraperGUI:
             messagebox.showinfo("Info", "Results folder created. No scrapes yet!")
             return
         
+        # Indexing a big results folder takes a while; its output reaches the log through the message queue
+        if not (self._runs_thread and self._runs_thread.is_alive()):
+            self._runs_thread = threading.Thread(target=self.show_recent_runs, daemon=True)
+            self._runs_thread.start()
         try:
             if os.name == 'nt':
                 os.startfile(results_dir)
@@ -262,6 +379,8 @@ def main():
     def on_closing():
         if app.is_scraping:
             if messagebox.askokcancel("Quit", "Scraping in progress. Do you want to quit?"):
+                # Close the browser now rather than leaving it behind with the daemon worker
+                app.cancel_token.cancel()
                 root.destroy()
         else:
             root.destroy()
@@ -0,0 +1,701 @@
+#!/usr/bin/env python3
+"""
+Long-lived scrape service with a persistent job queue.
+
+``python scraper.py --serve`` keeps Python, selenium and a pool of warm
+browsers loaded and accepts scrape jobs over a small local JSON API, so
+run.py, the GUI and ``scraper.py --submit`` don't pay for imports and a
+browser launch on every scrape. Jobs are stored in scrape_results/jobs.sqlite
+and survive restarts: anything still queued or running when the service
+stopped is picked up again on the next start.
+
+The service listens on SCRAPER_SERVICE (default http://127.0.0.1:8765), or a
+Unix socket given as unix:/path/to/scraper.sock:
+
+    GET  /health                  service status and queue length
+    GET  /jobs?status=&limit=     latest jobs
+    POST /jobs                    {"url": ..., "show_browser": false, "options": {"wait": "fixed", ...}}
+    GET  /jobs/<id>               one job, with its result summary once done
+    GET  /jobs/<id>/log?after=N   log lines after line N
+    POST /jobs/<id>/cancel        cancel a queued or running job
+
+POSTs must be ``Content-Type: application/json`` and requests must be
+addressed to localhost, so a web page open in the user's browser can't queue
+scrapes. If SCRAPER_SERVICE_TOKEN is set (required to listen on anything but
+loopback) every request needs it in an ``X-Scraper-Token`` header instead.
+
+From the shell:
+
+    python service.py submit https://example.com    # queue a job and follow its log
+    python service.py jobs
+    python service.py cancel 12
+"""
+import argparse
+import hmac
+import http.client
+import json
+import os
+import socket
+import socketserver
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+from cancellation import CancelToken, ScrapeCancelled
+
+DEFAULT_ADDRESS = os.environ.get('SCRAPER_SERVICE') or 'http://127.0.0.1:8765'
+DEFAULT_JOBS_FILE = os.path.join('scrape_results', 'jobs.sqlite')
+DEFAULT_TOKEN = os.environ.get('SCRAPER_SERVICE_TOKEN') or None
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1')
+
+# WebScraper options a job may set; everything else (capture rules, caches, classifier...)
+# comes from the flags the service was started with
+JOB_OPTIONS = ('wait', 'wait_timeout', 'wait_options', 'output_format', 'inline_body_limit', 'diff', 'mode',
+               'stream')
+
+JOB_LOG_LINES = 2000
+# A job still 'running' at startup after this many tries keeps taking the service down with it
+MAX_JOB_ATTEMPTS = 3
+MAX_RESULT_GROUPS = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    show_browser INTEGER NOT NULL DEFAULT 0,
+    options TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL,
+    submitted_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result_file TEXT,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, id);
+"""
+
+FINISHED = ('done', 'failed', 'cancelled')
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class JobStore:
+    """SQLite-backed job queue; one service process owns it at a time"""
+    def __init__(self, path=DEFAULT_JOBS_FILE):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def _job(self, row):
+        if row is None:
+            return None
+        job = dict(row)
+        job['show_browser'] = bool(job['show_browser'])
+        job['options'] = json.loads(job['options'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def requeue_interrupted(self, max_attempts=MAX_JOB_ATTEMPTS):
+        """Put jobs left 'running' by a service that died back in the queue; returns (re-queued, failed)"""
+        with self._lock, self._conn:
+            failed = self._conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, "
+                "error = 'Interrupted ' || attempts || ' times (did it crash the service?)' "
+                "WHERE status = 'running' AND attempts >= ?", (_now(), max_attempts)
+            ).rowcount
+            requeued = self._conn.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'").rowcount
+        return requeued, failed
+
+    def add(self, url, show_browser=False, options=None):
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (url, show_browser, options, status, submitted_at) VALUES (?, ?, ?, 'queued', ?)",
+                (url, int(show_browser), json.dumps(options or {}), _now())
+            )
+        return self.get(cursor.lastrowid)
+
+    def claim(self):
+        """Mark the oldest queued job as running and return it, or None if the queue is empty"""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE jobs SET status = 'running', started_at = ?, attempts = attempts + 1 "
+                               "WHERE id = ?", (_now(), row['id']))
+        return self.get(row['id'])
+
+    def finish(self, job_id, status, result_file=None, result=None, error=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result_file = ?, result = ?, error = ? WHERE id = ?",
+                (status, _now(), result_file, json.dumps(result) if result is not None else None, error, job_id)
+            )
+
+    def requeue(self, job_id):
+        """Put a job interrupted by a clean shutdown back in the queue without counting the attempt"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE jobs SET status = 'queued', started_at = NULL, attempts = attempts - 1 "
+                               "WHERE id = ?", (job_id,))
+
+    def cancel_queued(self, job_id):
+        """Cancel a job that hasn't started; returns False if it isn't queued"""
+        with self._lock, self._conn:
+            return self._conn.execute("UPDATE jobs SET status = 'cancelled', finished_at = ? "
+                                      "WHERE id = ? AND status = 'queued'", (_now(), job_id)).rowcount == 1
+
+    def get(self, job_id):
+        with self._lock:
+            return self._job(self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def list(self, status=None, limit=20):
+        query = "SELECT * FROM jobs"
+        params = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [self._job(row) for row in self._conn.execute(query, params)]
+
+    def counts(self):
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def job_result(scraper):
+    """JSON summary of a finished scrape for clients that don't read the result file"""
+    from bodies import preview_body
+
+    groups = []
+    for group in scraper.endpoint_groups.groups()[:MAX_RESULT_GROUPS]:
+        endpoint = scraper.endpoint_groups.sample(group)
+        summary = {key: group[key] for key in ('method', 'template', 'count', 'statuses',
+                                               'content_type', 'matched_rule', 'sample_url')}
+        if endpoint.get('body'):
+            summary['preview'], summary['preview_is_json'] = preview_body(endpoint['body'], 300)
+        groups.append(summary)
+    return {
+        'title': scraper.page_content.get('title'),
+        'final_url': scraper.page_content.get('url'),
+        'fetch_mode': scraper.scrape_info.get('fetch_mode'),
+        'request_count': scraper.request_count,
+        'endpoint_count': scraper.endpoint_groups.count,
+        'groups': groups,
+        'metrics': scraper.metrics.to_dict()
+    }
+
+
+class ScrapeService:
+    """Worker threads that run queued jobs on warm, pooled browsers"""
+    def __init__(self, workers=2, scraper_options=None, jobs_file=DEFAULT_JOBS_FILE, browser_args=(), log=print):
+        self.workers = workers
+        self.scraper_options = dict(scraper_options or {})
+        self.browser_args = tuple(browser_args)
+        self.store = JobStore(jobs_file)
+        self.log = log
+        self.started_at = _now()
+        self._pools = {}
+        self._tokens = {}
+        self._logs = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stopping = False
+        self._threads = []
+
+    def start(self):
+        requeued, failed = self.store.requeue_interrupted()
+        if requeued:
+            self.log(f"♻️  Re-queued {requeued} job(s) interrupted by the last shutdown")
+        if failed:
+            self.log(f"❌ Gave up on {failed} job(s) interrupted {MAX_JOB_ATTEMPTS} times")
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"scrape-worker-{n + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Stop the workers; running jobs are cancelled and go back in the queue for the next start"""
+        with self._lock:
+            self._stopping = True
+            tokens = list(self._tokens.values())
+            self._wakeup.notify_all()
+        for token in tokens:
+            token.cancel()
+        for thread in self._threads:
+            thread.join(timeout=30)
+        for pool in self._pools.values():
+            pool.close()
+        self.store.close()
+
+    def _pool(self, show_browser):
+        # One lazily filled pool per window mode, so headless and visible jobs both reuse browsers
+        from scraper import BrowserPool
+
+        with self._lock:
+            if show_browser not in self._pools:
+                self._pools[show_browser] = BrowserPool(size=self.workers, show_browser=show_browser,
+                                                        browser_args=self.browser_args)
+            pool = self._pools[show_browser]
+            others = [other for mode, other in self._pools.items() if mode != show_browser]
+        # Idle browsers of the other mode go, so the two pools together never run more than
+        # `workers` Chromes: every live browser is then either idle here or in use by a worker
+        for other in others:
+            other.discard_idle()
+        return pool
+
+    def _job_options(self, options):
+        """WebScraper options for a job: the service defaults with the job's own options on top"""
+        merged = dict(self.scraper_options, **options)
+        own_wait = self.scraper_options.get('wait', 'network-idle')
+        if 'wait_options' not in options and options.get('wait', own_wait) != own_wait:
+            # The service's wait_options belong to its own strategy (idle_ms for network-idle...)
+            merged['wait_options'] = {}
+        return merged
+
+    def _validate(self, options):
+        """Reject bad job options at submit time rather than in a worker"""
+        from waits import check_wait_options
+
+        if not isinstance(options, dict):
+            raise ValueError("'options' must be an object")
+        unknown = sorted(set(options) - set(JOB_OPTIONS))
+        if unknown:
+            raise ValueError(f"Unsupported job option(s): {', '.join(unknown)} (allowed: {', '.join(JOB_OPTIONS)})")
+        merged = self._job_options(options)
+        check_wait_options(merged.get('wait', 'network-idle'), merged.get('wait_options') or {})
+
+    def submit(self, url, show_browser=False, options=None):
+        options = options or {}
+        self._validate(options)
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        job = self.store.add(url, show_browser, options)
+        with self._lock:
+            self._wakeup.notify()
+        return job
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job; returns the job, or None if there is no such job"""
+        if not self.store.cancel_queued(job_id):
+            with self._lock:
+                token = self._tokens.get(job_id)
+            if token:
+                token.cancel()
+        return self.store.get(job_id)
+
+    def job_log(self, job_id, after=0):
+        """Log lines numbered after ``after``, and the number to ask for next time"""
+        with self._lock:
+            lines, total = self._logs.get(job_id, ((), 0))
+            start = max(after, total - len(lines))
+            return list(lines)[start - (total - len(lines)):], total
+
+    def health(self):
+        counts = self.store.counts()
+        return {
+            'status': 'ok',
+            'pid': os.getpid(),
+            'started_at': self.started_at,
+            'workers': self.workers,
+            'queued': counts.get('queued', 0),
+            'running': counts.get('running', 0),
+            'jobs': counts
+        }
+
+    def _append_log(self, job_id, message):
+        with self._lock:
+            lines, total = self._logs[job_id]
+            lines.append(message)
+            self._logs[job_id] = (lines, total + 1)
+
+    def _next_job(self):
+        with self._lock:
+            while not self._stopping:
+                job = self.store.claim()
+                if job:
+                    self._tokens[job['id']] = CancelToken()
+                    self._logs[job['id']] = (deque(maxlen=JOB_LOG_LINES), 0)
+                    return job, self._tokens[job['id']]
+                # Submissions notify straight away; the timeout is only a safety net
+                self._wakeup.wait(timeout=5)
+            return None, None
+
+    def _work(self):
+        while True:
+            job, token = self._next_job()
+            if job is None:
+                return
+            self._run(job, token)
+            with self._lock:
+                self._tokens.pop(job['id'], None)
+                # Keep the logs of recent jobs only
+                for old_id in sorted(self._logs)[:-100]:
+                    if old_id not in self._tokens:
+                        del self._logs[old_id]
+
+    def _run(self, job, token):
+        from scraper import WebScraper
+
+        self.log(f"🚀 Job {job['id']}: {job['url']}")
+        options = self._job_options(job['options'])
+        scraper = WebScraper(pool=self._pool(job['show_browser']), **options)
+        scraper.gui_log = lambda msg: self._append_log(job['id'], msg)
+        scraper.verbose = False
+        try:
+            scraper.scrape(job['url'], show_browser=job['show_browser'], cancel=token)
+        except ScrapeCancelled:
+            if self._stopping:
+                self.store.requeue(job['id'])
+                self.log(f"⏸  Job {job['id']} interrupted by shutdown, re-queued")
+            else:
+                self.store.finish(job['id'], 'cancelled')
+                self.log(f"⏹  Job {job['id']} cancelled")
+            return
+        except Exception as e:
+            self._append_log(job['id'], f"❌ ERROR: {e}")
+            self.store.finish(job['id'], 'failed', error=str(e))
+            self.log(f"❌ Job {job['id']} failed: {e}")
+            return
+
+        self.store.finish(job['id'], 'done', result_file=scraper.result_file, result=job_result(scraper))
+        self.log(f"✅ Job {job['id']} done: {scraper.endpoint_groups.count} API endpoints, {scraper.result_file}")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "WebScraperService/1.0"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def log_message(self, format, *args):
+        # Unix socket peers have no address, and per-request lines would drown the job log
+        pass
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _refuse(self, post=False):
+        """Error response for requests that may come from somewhere other than a local client, else None"""
+        token = self.server.token
+        if token:
+            if not hmac.compare_digest(self.headers.get('X-Scraper-Token', ''), token):
+                return self._send(401, {'error': "Missing or wrong X-Scraper-Token"})
+        elif self.server.check_host:
+            # Blocks DNS-rebinding pages that reach 127.0.0.1 under their own host name
+            host = urlsplit(f"//{self.headers.get('Host', '')}").hostname
+            if host not in LOCAL_HOSTS:
+                return self._send(403, {'error': "Requests must be addressed to localhost"})
+        # Browsers can't send a cross-origin JSON POST without a CORS preflight, which we never answer
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+        if post and content_type != 'application/json':
+            return self._send(415, {'error': "POST bodies must be Content-Type: application/json"})
+        return None
+
+    def _route(self):
+        parts = urlsplit(self.path)
+        segments = [segment for segment in parts.path.split('/') if segment]
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        return segments, query
+
+    def _job_id(self, segment):
+        try:
+            return int(segment)
+        except ValueError:
+            return None
+
+    def do_GET(self):
+        if self._refuse():
+            return
+        segments, query = self._route()
+        try:
+            if segments == ['health']:
+                return self._send(200, self.service.health())
+            if segments == ['jobs']:
+                limit = int(query.get('limit', 20))
+                return self._send(200, {'jobs': self.service.store.list(query.get('status'), limit)})
+            if len(segments) in (2, 3) and segments[0] == 'jobs':
+                job_id = self._job_id(segments[1])
+                job = job_id is not None and self.service.store.get(job_id)
+                if not job:
+                    return self._send(404, {'error': f"No job {segments[1]}"})
+                if len(segments) == 2:
+                    return self._send(200, job)
+                if segments[2] == 'log':
+                    lines, next_line = self.service.job_log(job_id, int(query.get('after', 0)))
+                    return self._send(200, {'lines': lines, 'next': next_line, 'status': job['status']})
+        except ValueError as e:
+            return self._send(400, {'error': str(e)})
+        self._send(404, {'error': f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self._refuse(post=True):
+            return
+        segments, _ = self._route()
+        if segments == ['jobs']:
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}')
+                if not isinstance(body, dict) or not body.get('url'):
+                    raise ValueError("Job needs a 'url'")
+                job = self.service.submit(body['url'], bool(body.get('show_browser')), body.get('options'))
+            except ValueError as e:
+                return self._send(400, {'error': str(e)})
+            return self._send(202, job)
+        if len(segments) == 3 and segments[0] == 'jobs' and segments[2] == 'cancel':
+            job_id = self._job_id(segments[1])
+            job = job_id is not None and self.service.cancel(job_id)
+            if not job:
+                return self._send(404, {'error': f"No job {segments[1]}"})
+            return self._send(202, job)
+        self._send(404, {'error': f"Unknown path {self.path}"})
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _parse_address(address):
+    """('unix', path) or ('tcp', (host, port)) from unix:/path or http://host:port"""
+    if address.startswith('unix:'):
+        return 'unix', address[len('unix:'):]
+    parts = urlsplit(address if '://' in address else f"http://{address}")
+    return 'tcp', (parts.hostname or '127.0.0.1', parts.port or 8765)
+
+
+def serve(address=DEFAULT_ADDRESS, workers=2, scraper_options=None, jobs_file=DEFAULT_JOBS_FILE, browser_args=(),
+          token=DEFAULT_TOKEN):
+    """Run the service in the foreground until interrupted"""
+    kind, target = _parse_address(address)
+    if kind == 'tcp' and target[0] not in LOCAL_HOSTS and not token:
+        raise ValueError(f"Refusing to listen on {target[0]} without a token; set SCRAPER_SERVICE_TOKEN")
+    if kind == 'unix':
+        if not hasattr(socket, 'AF_UNIX'):
+            raise OSError("Unix sockets are not supported on this platform")
+        if os.path.exists(target):
+            os.unlink(target)
+        server = _UnixHTTPServer(target, _Handler)
+    else:
+        server = ThreadingHTTPServer(target, _Handler)
+        server.daemon_threads = True
+    server.token = token
+    # Browsers can't reach a Unix socket, so only TCP needs the Host check
+    server.check_host = kind == 'tcp'
+
+    service = ScrapeService(workers=workers, scraper_options=scraper_options, jobs_file=jobs_file,
+                            browser_args=browser_args)
+    server.service = service
+    service.start()
+    print(f"🛰️  Scrape service listening on {address} with {workers} workers (Ctrl+C to stop)")
+    print(f"📋 Jobs are stored in {jobs_file}\n")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopping service, running jobs will resume on the next start...")
+    finally:
+        server.server_close()
+        service.stop()
+        if kind == 'unix' and os.path.exists(target):
+            os.unlink(target)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__('localhost', timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+class ServiceError(Exception):
+    """The service answered with an error status"""
+
+
+class ServiceClient:
+    """Talks to a running scrape service"""
+    def __init__(self, address=DEFAULT_ADDRESS, timeout=10, token=DEFAULT_TOKEN):
+        self.address = address
+        self.timeout = timeout
+        self.token = token
+        self._kind, self._target = _parse_address(address)
+
+    @classmethod
+    def connect(cls, address=None, timeout=0.5):
+        """Return a client if a service answers at ``address`` (default SCRAPER_SERVICE), else None"""
+        client = cls(address or DEFAULT_ADDRESS)
+        try:
+            client._request('GET', '/health', timeout=timeout)
+        except (OSError, ServiceError, ValueError):
+            return None
+        return client
+
+    def _request(self, method, path, payload=None, timeout=None):
+        if self._kind == 'unix':
+            conn = _UnixHTTPConnection(self._target, timeout or self.timeout)
+        else:
+            conn = http.client.HTTPConnection(*self._target, timeout=timeout or self.timeout)
+        try:
+            body = json.dumps(payload if payload is not None else {}).encode('utf-8') if method == 'POST' else None
+            headers = {'Content-Type': 'application/json'} if body is not None else {}
+            if self.token:
+                headers['X-Scraper-Token'] = self.token
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = json.loads(response.read() or b'{}')
+        finally:
+            conn.close()
+        if response.status >= 400:
+            raise ServiceError(data.get('error') or f"HTTP {response.status}")
+        return data
+
+    def health(self):
+        return self._request('GET', '/health')
+
+    def submit(self, url, show_browser=False, **options):
+        return self._request('POST', '/jobs', {'url': url, 'show_browser': show_browser, 'options': options})
+
+    def job(self, job_id):
+        return self._request('GET', f"/jobs/{job_id}")
+
+    def jobs(self, status=None, limit=20):
+        query = f"?limit={limit}" + (f"&status={quote(status)}" if status else '')
+        return self._request('GET', f"/jobs{query}")['jobs']
+
+    def log(self, job_id, after=0):
+        data = self._request('GET', f"/jobs/{job_id}/log?after={after}")
+        return data['lines'], data['next']
+
+    def cancel(self, job_id):
+        return self._request('POST', f"/jobs/{job_id}/cancel")
+
+    def wait(self, job_id, on_log=print, poll=0.5):
+        """Follow a job's log until it finishes and return the finished job"""
+        after = 0
+        while True:
+            lines, after = self.log(job_id, after)
+            for line in lines:
+                on_log(line)
+            job = self.job(job_id)
+            if job['status'] in FINISHED:
+                # Lines logged between the last poll and the job finishing
+                lines, after = self.log(job_id, after)
+                for line in lines:
+                    on_log(line)
+                return job
+            time.sleep(poll)
+
+
+def submit_and_follow(client, url, show_browser=False, **options):
+    """Queue a scrape, echo its log and print a short summary; returns the finished job"""
+    job = client.submit(url, show_browser=show_browser, **options)
+    print(f"📋 Queued as job {job['id']} on {client.address}")
+    job = client.wait(job['id'])
+
+    if job['status'] != 'done':
+        print(f"\n❌ Job {job['id']} {job['status']}" + (f": {job['error']}" if job['error'] else ''))
+        return job
+    result = job['result']
+    print(f"\n🎯 API Endpoints Found: {result['endpoint_count']} ({len(result['groups'])} unique), "
+          f"{result['request_count']} requests")
+    print(f"📁 Complete Data: {job['result_file']}\n")
+    return job
+
+
+def print_job(job):
+    print(f"[{job['id']}] {job['status']:<9} {job['url']}")
+    if job.get('result'):
+        result = job['result']
+        print(f"    {result['endpoint_count']} API endpoints, {result['request_count']} requests  "
+              f"→ {job['result_file']}")
+    if job.get('error'):
+        print(f"    ❌ {job['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Client for the scrape service (start it with scraper.py --serve)")
+    parser.add_argument('--service', default=DEFAULT_ADDRESS,
+                        help=f"service address, http://host:port or unix:/path (default: {DEFAULT_ADDRESS})")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    submit = commands.add_parser('submit', help="queue a scrape and follow its log")
+    submit.add_argument('url')
+    submit.add_argument('--show-browser', action='store_true', help="open a visible browser window")
+    submit.add_argument('--wait', help="wait strategy for this job")
+    submit.add_argument('--selector', help="CSS selector to wait for (implies --wait selector)")
+    submit.add_argument('--idle-ms', type=int, help="quiet period for network-idle in ms")
+    submit.add_argument('--max-inflight', type=int, help="requests network-idle lets stay unanswered")
+    submit.add_argument('--mode', choices=['browser', 'http', 'auto'])
+    submit.add_argument('--detach', action='store_true', help="print the job id and return without waiting")
+
+    jobs = commands.add_parser('jobs', help="list recent jobs")
+    jobs.add_argument('--status', choices=['queued', 'running'] + list(FINISHED))
+    jobs.add_argument('--limit', type=int, default=20)
+
+    status = commands.add_parser('status', help="show one job")
+    status.add_argument('job_id', type=int)
+
+    cancel = commands.add_parser('cancel', help="cancel a queued or running job")
+    cancel.add_argument('job_id', type=int)
+
+    commands.add_parser('health', help="check that the service is up")
+    args = parser.parse_args()
+
+    client = ServiceClient(args.service)
+    try:
+        if args.command == 'submit':
+            options = {key: value for key, value in (('wait', args.wait), ('mode', args.mode)) if value}
+            wait_options = {key: value for key, value in (('idle_ms', args.idle_ms),
+                                                          ('max_inflight', args.max_inflight)) if value is not None}
+            if args.selector:
+                options['wait'] = 'selector'
+                wait_options['selector'] = args.selector
+            if wait_options:
+                options['wait_options'] = wait_options
+            if args.detach:
+                job = client.submit(args.url, show_browser=args.show_browser, **options)
+                print(f"📋 Queued job {job['id']}: {job['url']}")
+            else:
+                job = submit_and_follow(client, args.url, show_browser=args.show_browser, **options)
+                sys.exit(0 if job['status'] == 'done' else 1)
+        elif args.command == 'jobs':
+            for job in client.jobs(args.status, args.limit):
+                print_job(job)
+        elif args.command == 'status':
+            print_job(client.job(args.job_id))
+        elif args.command == 'cancel':
+            print_job(client.cancel(args.job_id))
+        else:
+            print(json.dumps(client.health(), indent=2))
+    except (OSError, ServiceError) as e:
+        print(f"❌ {args.service}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Streaming capture: record traffic while the page is still loading.
+
+The default (batch) capture reads ``driver.requests`` once the page has
+settled, so selenium-wire keeps every request and body until then and the
+whole lot is unpickled at once. In stream mode selenium-wire's interceptors
+hand each response over as soon as it arrives. A background thread feeds it
+to WebScraper._capture (and so to the NDJSON writer), and selenium-wire's own
+storage is emptied with ``del driver.requests`` every few seconds. Memory
+then stays flat on pages that poll forever, and NDJSON records appear on disk
+before the page settles.
+
+Requests that never get a response (still pending, or failed upstream) are
+remembered from the request interceptor and recorded without a response when
+the stream stops, so all_requests matches batch mode.
+"""
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+DRAIN_INTERVAL = 2.0
+QUEUE_SIZE = 1000
+
+
+class StreamingCapture:
+    """Feeds intercepted traffic to ``capture`` (a callable taking a selenium-wire request) as it arrives"""
+    def __init__(self, capture, cancel=None, flush=None, drain_interval=DRAIN_INTERVAL):
+        self.capture = capture
+        self.cancel = cancel
+        self.flush = flush
+        self.drain_interval = drain_interval
+        self.captured = 0
+        # Bounded so a page producing traffic faster than it can be written slows down
+        # (the proxy thread blocks) instead of piling up bodies in memory
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._pending = OrderedDict()
+        self._started = 0
+        self._responded = 0
+        self._driver = None
+        self._chained = None
+        self._thread = None
+        self._stopping = threading.Event()
+        self._error = None
+
+    def start(self, driver):
+        """Install the interceptors (keeping any request interceptor already set) and start consuming"""
+        self._driver = driver
+        self._chained = getattr(driver, 'request_interceptor', None)
+        driver.request_interceptor = self._on_request
+        driver.response_interceptor = self._on_response
+        self._thread = threading.Thread(target=self._consume, name='stream-capture', daemon=True)
+        self._thread.start()
+
+    def _on_request(self, request):
+        # Runs on selenium-wire's proxy thread, so keep it short
+        if self._chained:
+            self._chained(request)
+        with self._lock:
+            self._started += 1
+            self._pending.setdefault((request.method, request.url), []).append(request)
+
+    def _on_response(self, request, response):
+        with self._lock:
+            self._responded += 1
+            key = (request.method, request.url)
+            waiting = self._pending.get(key)
+            if waiting:
+                waiting.pop(0)
+                if not waiting:
+                    del self._pending[key]
+        self._queue.put(request)
+
+    def traffic(self):
+        """(requests seen, requests still waiting for a response) for the network-idle wait"""
+        with self._lock:
+            return self._started, self._started - self._responded
+
+    def _consume(self):
+        next_drain = time.monotonic() + self.drain_interval
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                request = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                request = None
+            if self._error:
+                # Keep emptying the queue so the proxy thread never blocks; stop() reports the error
+                continue
+            try:
+                if request is not None:
+                    self.capture(request)
+                    self.captured += 1
+                driver = self._driver
+                if time.monotonic() >= next_drain and driver is not None:
+                    # Everything in selenium-wire's storage has been (or will be) handed over
+                    # by the interceptors, so it can be thrown away
+                    del driver.requests
+                    if self.flush:
+                        self.flush()
+                    next_drain = time.monotonic() + self.drain_interval
+            except Exception as e:
+                self._error = e
+
+    def stop(self):
+        """Wait for queued responses to be recorded, then record requests that never got one"""
+        if self._thread is None:
+            return
+        # Detach first so nothing is queued after the consumer has finished
+        self.detach()
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+        if self._error:
+            raise self._error
+
+        with self._lock:
+            pending = [request for waiting in self._pending.values() for request in waiting]
+            self._pending.clear()
+        for request in pending:
+            if self.cancel:
+                self.cancel.raise_if_cancelled()
+            self.capture(request)
+            self.captured += 1
+
+    def abort(self):
+        """Stop consuming without recording anything further (failed or cancelled scrape)"""
+        if self._thread is None:
+            return
+        self.detach()
+        self._error = self._error or RuntimeError("Streaming capture aborted")
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    def detach(self):
+        """Restore the driver's interceptors (safe to call more than once)"""
+        driver, self._driver = self._driver, None
+        if driver is None:
+            return
+        try:
+            if self._chained:
+                driver.request_interceptor = self._chained
+            else:
+                del driver.request_interceptor
+            del driver.response_interceptor
+            del driver.requests
+        except Exception:
+            # The browser may already be gone (cancelled scrape)
+            pass
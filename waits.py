@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Page wait strategies used by WebScraper.scrape after navigation.
+
+Each strategy polls the driver until its condition holds or the hard timeout
+cap is reached, and returns True if the condition was met. With a CancelToken
+the wait ends early by raising ScrapeCancelled.
+"""
+import inspect
+import time
+
+from cancellation import CancelToken
+
+POLL_INTERVAL = 0.1
+
+
+def _poll(condition, timeout, cancel, poll=POLL_INTERVAL):
+    deadline = time.monotonic() + timeout
+    while True:
+        cancel.raise_if_cancelled()
+        try:
+            if condition():
+                return True
+        except Exception:
+            # The page may be mid-navigation; keep polling until the cap
+            pass
+        if time.monotonic() >= deadline:
+            return False
+        cancel.sleep(poll)
+
+
+def wait_fixed(driver, timeout, cancel, seconds=5):
+    """Sleep for a fixed number of seconds (the original behaviour)"""
+    cancel.sleep(min(seconds, timeout))
+    return seconds <= timeout
+
+
+def wait_document_ready(driver, timeout, cancel):
+    """Wait until document.readyState is 'complete'"""
+    return _poll(lambda: driver.execute_script("return document.readyState") == 'complete', timeout, cancel)
+
+
+def storage_traffic(driver):
+    """(requests seen, requests without a response) read from selenium-wire's storage index.
+
+    driver.requests unpickles every stored request and response (bodies included) from
+    disk, so polling it costs more the more the page has loaded. The storage keeps a
+    small in-memory index that answers the same question without touching the bodies.
+    """
+    storage = getattr(getattr(driver, 'backend', None), 'storage', None)
+    if hasattr(storage, '_index'):
+        # Disk storage (selenium-wire's default)
+        with storage._lock:
+            index = storage._index[:]
+        return len(index), sum(1 for entry in index if not entry.has_response)
+    if hasattr(storage, '_requests'):
+        # In-memory storage ('request_storage': 'memory')
+        with storage._lock:
+            entries = list(storage._requests.values())
+        return len(entries), sum(1 for entry in entries if entry['request'].response is None)
+    requests = driver.requests
+    return len(requests), sum(1 for r in requests if r.response is None)
+
+
+def wait_network_idle(driver, timeout, cancel, idle_ms=500, max_inflight=0, stall_ms=2000, traffic=None):
+    """Wait until no new requests have been captured and no responses have arrived for idle_ms.
+
+    Requests still waiting for a response count as activity unless there are
+    at most max_inflight of them (long-polling pages never go fully idle), or
+    until the network has been quiet for stall_ms: by then they are failed,
+    streaming or long-polling requests that would otherwise hold every wait to
+    the cap. ``traffic`` can supply (requests seen, requests in flight) instead
+    of selenium-wire's storage index, as streaming capture does.
+    """
+    state = {'seen': None, 'since': time.monotonic()}
+    traffic = traffic or (lambda: storage_traffic(driver))
+
+    def idle():
+        seen = traffic()
+        now = time.monotonic()
+        if seen != state['seen']:
+            state['seen'] = seen
+            state['since'] = now
+            return False
+        quiet = (now - state['since']) * 1000
+        # Every request still in flight was seen before the quiet period began
+        if seen[1] > max_inflight and quiet < max(stall_ms, idle_ms):
+            return False
+        return quiet >= idle_ms
+
+    return _poll(idle, timeout, cancel)
+
+
+def wait_for_selector(driver, timeout, cancel, selector):
+    """Wait until an element matching the CSS selector is present"""
+    return _poll(lambda: driver.execute_script("return !!document.querySelector(arguments[0])", selector),
+                 timeout, cancel)
+
+
+WAIT_STRATEGIES = {
+    'fixed': wait_fixed,
+    'dom-ready': wait_document_ready,
+    'network-idle': wait_network_idle,
+    'selector': wait_for_selector,
+}
+
+
+def check_wait_options(strategy, options):
+    """Raise ValueError unless ``options`` are valid keyword arguments for ``strategy``"""
+    if strategy not in WAIT_STRATEGIES:
+        raise ValueError(f"Unknown wait strategy '{strategy}' (choose from: {', '.join(WAIT_STRATEGIES)})")
+    if not isinstance(options, dict):
+        raise ValueError("wait_options must be an object")
+    # Everything after (driver, timeout, cancel) except the internal traffic hook
+    params = list(inspect.signature(WAIT_STRATEGIES[strategy]).parameters.values())[3:]
+    allowed = {p.name for p in params if p.name != 'traffic'}
+    unknown = sorted(set(options) - allowed)
+    if unknown:
+        raise ValueError(f"Wait strategy '{strategy}' doesn't take {', '.join(unknown)}"
+                         f" (options: {', '.join(sorted(allowed)) or 'none'})")
+    missing = [p.name for p in params if p.default is inspect.Parameter.empty and p.name not in options]
+    if missing:
+        raise ValueError(f"Wait strategy '{strategy}' needs {', '.join(missing)}")
+
+
+def wait_for_page(driver, strategy='network-idle', timeout=15, cancel=None, traffic=None, **options):
+    """Run a wait strategy and return a record of what happened for scrape_info"""
+    if strategy not in WAIT_STRATEGIES:
+        raise ValueError(f"Unknown wait strategy '{strategy}' (choose from: {', '.join(WAIT_STRATEGIES)})")
+
+    started = time.monotonic()
+    extra = {'traffic': traffic} if traffic and strategy == 'network-idle' else {}
+    satisfied = WAIT_STRATEGIES[strategy](driver, timeout, cancel or CancelToken(), **options, **extra)
+
+    return {
+        'strategy': strategy,
+        'options': options,
+        'timeout_s': timeout,
+        'waited_s': round(time.monotonic() - started, 3),
+        'timed_out': not satisfied
+    }
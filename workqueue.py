@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+Shared work queue for scraping one URL list from several machines.
+
+The queue is a SQLite file on storage every node can reach (an NFS/SMB
+share). Nodes lease URLs in shards of ``batch_size`` and renew their leases
+while they work. If a node dies, its leases expire and the URLs go back to
+the queue for another node. A failed URL is retried with exponential backoff.
+After ``max_attempts`` failures, or after its lease has expired that many
+times (it keeps killing or hanging its node), it is parked as ``poison`` so
+it can't block the run.
+
+    python workqueue.py add /shared/queue.sqlite urls.txt
+    python scraper.py --node /shared/queue.sqlite --workers 4 --headless    # on every machine
+    python workqueue.py stats /shared/queue.sqlite
+    python workqueue.py poison /shared/queue.sqlite
+    python results_index.py merge /shared/node-*/scrape_results/index.sqlite
+
+Each node writes results to its own scrape_results/ (run it from its own
+folder, e.g. /shared/node-a) and records them in its own index, which
+``results_index.py merge`` consolidates. Lease times come from each node's
+clock, so keep the machines' clocks in sync (NTP).
+"""
+import argparse
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from urllib.parse import urlparse
+
+from cancellation import CancelToken, ScrapeCancelled
+
+DEFAULT_LEASE_S = 600
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_DELAY_S = 60
+DEFAULT_SCRAPE_TIMEOUT_S = 300
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    domain TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    node TEXT,
+    result_file TEXT,
+    last_error TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS urls_claim ON urls(status, available_at, id);
+CREATE INDEX IF NOT EXISTS urls_lease ON urls(status, lease_expires);
+"""
+
+STATUSES = ('queued', 'leased', 'done', 'poison')
+
+
+def _interleave_domains(urls):
+    """Round-robin URLs across domains so a shard doesn't hit a single site with every worker"""
+    by_domain = OrderedDict()
+    for url in urls:
+        by_domain.setdefault(urlparse(url).netloc, deque()).append(url)
+    while by_domain:
+        for domain in list(by_domain):
+            yield domain, by_domain[domain].popleft()
+            if not by_domain[domain]:
+                del by_domain[domain]
+
+
+class WorkQueue:
+    """URL queue with leases, retries and poison handling in a (shared) SQLite file"""
+    def __init__(self, path, max_attempts=DEFAULT_MAX_ATTEMPTS, retry_delay=DEFAULT_RETRY_DELAY_S):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Autocommit mode so claims can take the write lock up front with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        # WAL needs shared memory on one host; the classic rollback journal works across machines
+        self._conn.execute("PRAGMA journal_mode=DELETE")
+        self._conn.executescript(SCHEMA)
+
+    def _write(self, statements):
+        """Run ``statements(conn)`` in one immediate (write-locked) transaction and return its result"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def add(self, urls):
+        """Queue URLs (duplicates of URLs already in the queue are ignored); returns how many were added"""
+        rows = [(url, domain, time.time()) for domain, url in _interleave_domains(urls)]
+        return self._write(lambda conn: conn.executemany(
+            "INSERT OR IGNORE INTO urls (url, domain, updated_at) VALUES (?, ?, ?)", rows
+        ).rowcount)
+
+    def claim(self, node, limit, lease_s=DEFAULT_LEASE_S):
+        """Lease up to ``limit`` URLs for ``node``; returns a list of (id, url, attempt)"""
+        def statements(conn):
+            now = time.time()
+            # Leases that ran out belong to a node that died or hung on that URL
+            conn.execute(
+                "UPDATE urls SET status = 'poison', lease_owner = NULL, updated_at = ?, "
+                "last_error = 'lease expired ' || attempts || ' times (node died or hung)' "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?", (now, now, self.max_attempts)
+            )
+            conn.execute("UPDATE urls SET status = 'queued', lease_owner = NULL, updated_at = ? "
+                         "WHERE status = 'leased' AND lease_expires < ?", (now, now))
+            rows = conn.execute("SELECT id, url, attempts + 1 FROM urls WHERE status = 'queued' AND available_at <= ? "
+                                "ORDER BY id LIMIT ?", (now, limit)).fetchall()
+            conn.executemany("UPDATE urls SET status = 'leased', lease_owner = ?, lease_expires = ?, "
+                             "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                             [(node, now + lease_s, now, row[0]) for row in rows])
+            return rows
+        return self._write(statements)
+
+    def renew(self, node, ids, lease_s=DEFAULT_LEASE_S):
+        """Extend ``node``'s leases on ``ids``; returns the ids it no longer holds"""
+        ids = list(ids)
+        if not ids:
+            return []
+
+        def statements(conn):
+            now = time.time()
+            held = set()
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                marks = ','.join('?' * len(chunk))
+                conn.execute(f"UPDATE urls SET lease_expires = ? WHERE lease_owner = ? AND status = 'leased' "
+                             f"AND id IN ({marks})", [now + lease_s, node] + chunk)
+                held.update(row[0] for row in conn.execute(
+                    f"SELECT id FROM urls WHERE lease_owner = ? AND status = 'leased' AND id IN ({marks})",
+                    [node] + chunk
+                ))
+            return [job_id for job_id in ids if job_id not in held]
+        return self._write(statements)
+
+    def complete(self, node, job_id, result_file):
+        """Mark a leased URL done; returns False if the lease had already been lost to another node"""
+        return self._write(lambda conn: conn.execute(
+            "UPDATE urls SET status = 'done', node = ?, result_file = ?, lease_owner = NULL, last_error = NULL, "
+            "updated_at = ? WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (node, result_file, time.time(), job_id, node)
+        ).rowcount == 1)
+
+    def fail(self, node, job_id, error):
+        """Record a failed attempt; returns 'queued' (will be retried), 'poison' or None if the lease was lost"""
+        def statements(conn):
+            row = conn.execute("SELECT attempts FROM urls WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                               (job_id, node)).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            status = 'poison' if row[0] >= self.max_attempts else 'queued'
+            conn.execute("UPDATE urls SET status = ?, available_at = ?, lease_owner = NULL, node = ?, "
+                         "last_error = ?, updated_at = ? WHERE id = ?",
+                         (status, now + self.retry_delay * 2 ** (row[0] - 1), node, error, now, job_id))
+            return status
+        return self._write(statements)
+
+    def release(self, node, ids):
+        """Give back leased URLs that were never attempted (node shutting down) without counting an attempt"""
+        ids = list(ids)
+        if not ids:
+            return 0
+        marks = ','.join('?' * len(ids))
+        return self._write(lambda conn: conn.execute(
+            f"UPDATE urls SET status = 'queued', attempts = attempts - 1, lease_owner = NULL, updated_at = ? "
+            f"WHERE lease_owner = ? AND status = 'leased' AND id IN ({marks})", [time.time(), node] + ids
+        ).rowcount)
+
+    def remaining(self):
+        """URLs not yet done or poisoned (queued, backing off or leased)"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM urls WHERE status IN ('queued', 'leased')").fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM urls GROUP BY status").fetchall())
+            nodes = self._conn.execute(
+                "SELECT lease_owner, COUNT(*), MIN(lease_expires) FROM urls WHERE status = 'leased' "
+                "GROUP BY lease_owner ORDER BY lease_owner"
+            ).fetchall()
+            done_by = dict(self._conn.execute(
+                "SELECT node, COUNT(*) FROM urls WHERE status = 'done' GROUP BY node"
+            ).fetchall())
+        return {
+            'counts': {status: counts.get(status, 0) for status in STATUSES},
+            'leases': [{'node': node, 'leased': leased, 'expires_in_s': round(expires - time.time())}
+                       for node, leased, expires in nodes],
+            'done_by_node': done_by
+        }
+
+    def poison(self, limit=100):
+        with self._lock:
+            rows = self._conn.execute("SELECT id, url, attempts, node, last_error FROM urls WHERE status = 'poison' "
+                                      "ORDER BY updated_at DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(zip(('id', 'url', 'attempts', 'node', 'last_error'), row)) for row in rows]
+
+    def retry_poison(self, ids=None):
+        """Put poisoned URLs (all, or just ``ids``) back in the queue with a fresh attempt count"""
+        query = "UPDATE urls SET status = 'queued', attempts = 0, available_at = 0, updated_at = ? WHERE status = 'poison'"
+        params = [time.time()]
+        if ids:
+            query += f" AND id IN ({','.join('?' * len(ids))})"
+            params.extend(ids)
+        return self._write(lambda conn: conn.execute(query, params).rowcount)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class Node:
+    """Scrapes URLs leased from a WorkQueue on this machine until the queue is drained"""
+    def __init__(self, queue, node_id=None, workers=4, per_domain=2, batch_size=None, lease_s=DEFAULT_LEASE_S,
+                 scrape_timeout=DEFAULT_SCRAPE_TIMEOUT_S, show_browser=False, scraper_options=None, log=print):
+        self.queue = queue
+        self.node_id = node_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.workers = workers
+        self.per_domain = per_domain
+        self.batch_size = batch_size or workers * 5
+        self.lease_s = lease_s
+        self.scrape_timeout = scrape_timeout
+        self.show_browser = show_browser
+        self.scraper_options = scraper_options or {}
+        self.log = log
+        self.counts = {'done': 0, 'retried': 0, 'poisoned': 0, 'lost': 0}
+        self._cond = threading.Condition()
+        self._local = deque()
+        self._active = {}
+        self._running = {}
+        self._timed_out = set()
+        self._stop = threading.Event()
+        self._claiming = False
+        # Bumped whenever work may have become startable, so a worker never waits through a wakeup it missed
+        self._changes = 0
+
+    def run(self):
+        """Work until no URL is queued or leased anywhere (or Ctrl+C); returns this node's counts"""
+        from scraper import BrowserPool
+
+        self.log(f"🛰️  Node {self.node_id}: {self.workers} workers on {self.queue.path}")
+        pool = BrowserPool(size=self.workers, show_browser=self.show_browser)
+        threads = [threading.Thread(target=self._work, args=(pool,), daemon=True) for _ in range(self.workers)]
+        heartbeat = threading.Thread(target=self._heartbeat, daemon=True)
+        for thread in threads + [heartbeat]:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            self.log(f"\n👋 Stopping node {self.node_id}, returning unfinished URLs to the queue...")
+            self.stop()
+            for thread in threads:
+                thread.join()
+        finally:
+            self._stop.set()
+            with self._cond:
+                unstarted = [job_id for job_id, _, _ in self._local]
+                self._local.clear()
+            self.queue.release(self.node_id, unstarted)
+            pool.close()
+        return dict(self.counts)
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            running = list(self._running.values())
+            self._cond.notify_all()
+        for token, _ in running:
+            token.cancel()
+
+    def _take_local(self):
+        # First leased URL whose domain is under the per-domain limit
+        for row in self._local:
+            domain = urlparse(row[1]).netloc
+            if self._active.get(domain, 0) < self.per_domain:
+                self._local.remove(row)
+                self._active[domain] = self._active.get(domain, 0) + 1
+                return row
+        return None
+
+    def _next(self):
+        while not self._stop.is_set():
+            with self._cond:
+                row = self._take_local()
+                if row:
+                    return row
+                # One worker at a time refills the shard; the rest wait to be notified
+                claiming = not self._local and not self._claiming
+                self._claiming = self._claiming or claiming
+                running = bool(self._running)
+                seen = self._changes
+            if claiming:
+                # The shared DB can be locked by another node for a while, so it is never
+                # queried while holding _cond (the heartbeat and other workers need it)
+                claimed, remaining = self._claim(running)
+                if claimed:
+                    continue
+                if not running and not remaining:
+                    return None
+            with self._cond:
+                if self._stop.is_set() or self._changes != seen:
+                    # A shard arrived or a scrape finished since we looked
+                    continue
+                # Nothing we can start now: URLs backing off, leased elsewhere or held by the per-domain limit
+                self._cond.wait(timeout=5)
+        return None
+
+    def _claim(self, running):
+        """Lease a new shard into the local buffer; returns (claimed, URLs left anywhere in the queue)"""
+        claimed, remaining = [], 1
+        try:
+            claimed = self.queue.claim(self.node_id, self.batch_size, self.lease_s)
+            if not claimed and not running:
+                remaining = self.queue.remaining()
+        except sqlite3.Error as e:
+            self.log(f"⚠️  Could not lease URLs: {e}")
+        finally:
+            with self._cond:
+                self._claiming = False
+                if claimed:
+                    self._local.extend(claimed)
+                    self._changes += 1
+                self._cond.notify_all()
+        if claimed:
+            self.log(f"📦 Leased {len(claimed)} URLs")
+        return claimed, remaining
+
+    def _work(self, pool):
+        from scraper import WebScraper
+
+        while True:
+            row = self._next()
+            if row is None:
+                with self._cond:
+                    self._cond.notify_all()
+                return
+            job_id, url, attempt = row
+            token = CancelToken()
+            with self._cond:
+                self._running[job_id] = (token, time.monotonic())
+            try:
+                scraper = WebScraper(pool=pool, **self.scraper_options)
+                scraper.gui_log = lambda msg: None
+                scraper.verbose = False
+                scraper.scrape(url, cancel=token)
+            except ScrapeCancelled:
+                if job_id in self._timed_out:
+                    self._failed(job_id, url, attempt, f"timed out after {self.scrape_timeout}s")
+                else:
+                    self.queue.release(self.node_id, [job_id])
+            except Exception as e:
+                self._failed(job_id, url, attempt, str(e) or type(e).__name__)
+            else:
+                if self.queue.complete(self.node_id, job_id, scraper.result_file):
+                    self.counts['done'] += 1
+                    self.log(f"✅ {url} ({scraper.endpoint_groups.count} APIs)")
+                else:
+                    self.counts['lost'] += 1
+                    self.log(f"⚠️  {url} finished after its lease moved to another node; kept {scraper.result_file}")
+            finally:
+                with self._cond:
+                    self._running.pop(job_id, None)
+                    self._timed_out.discard(job_id)
+                    domain = urlparse(url).netloc
+                    self._active[domain] -= 1
+                    self._changes += 1
+                    self._cond.notify_all()
+
+    def _failed(self, job_id, url, attempt, error):
+        status = self.queue.fail(self.node_id, job_id, error)
+        if status == 'poison':
+            self.counts['poisoned'] += 1
+            self.log(f"☠️  {url} failed {attempt} times, marked poison: {error}")
+        elif status == 'queued':
+            self.counts['retried'] += 1
+            self.log(f"🔁 {url} failed (attempt {attempt}), will retry: {error}")
+        else:
+            self.counts['lost'] += 1
+
+    def _heartbeat(self):
+        while not self._stop.wait(min(60, self.lease_s / 3)):
+            now = time.monotonic()
+            with self._cond:
+                held = [row[0] for row in self._local] + list(self._running)
+                overdue = [(job_id, token) for job_id, (token, started) in self._running.items()
+                           if now - started > self.scrape_timeout]
+                self._timed_out.update(job_id for job_id, _ in overdue)
+            # A hung page is cancelled (and counted as a failure) instead of holding its lease forever
+            for _, token in overdue:
+                token.cancel()
+            try:
+                lost = self.queue.renew(self.node_id, held, self.lease_s)
+            except sqlite3.Error as e:
+                self.log(f"⚠️  Could not renew leases: {e}")
+                continue
+            if lost:
+                with self._cond:
+                    lost = set(lost)
+                    self._local = deque(row for row in self._local if row[0] not in lost)
+                self.log(f"⚠️  Lost the lease on {len(lost)} URLs (lease too short or clocks out of sync?)")
+
+
+def print_stats(stats):
+    counts = stats['counts']
+    total = sum(counts.values())
+    print(f"📊 {total} URLs: {counts['done']} done, {counts['queued']} queued, {counts['leased']} leased, "
+          f"{counts['poison']} poison")
+    for lease in stats['leases']:
+        print(f"   🛰️  {lease['node']}: {lease['leased']} leased (next lease expires in {lease['expires_in_s']}s)")
+    for node, done in sorted(stats['done_by_node'].items(), key=lambda item: -item[1]):
+        print(f"   ✅ {node}: {done} done")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage a shared scrape work queue (run nodes with scraper.py --node)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help="queue the URLs in a file ('-' reads stdin)")
+    add.add_argument('queue')
+    add.add_argument('urls')
+
+    stats = commands.add_parser('stats', help="progress and live leases")
+    stats.add_argument('queue')
+
+    poison = commands.add_parser('poison', help="list URLs that kept failing")
+    poison.add_argument('queue')
+    poison.add_argument('--limit', type=int, default=50)
+
+    retry = commands.add_parser('retry', help="put poison URLs back in the queue")
+    retry.add_argument('queue')
+    retry.add_argument('ids', nargs='*', type=int, help="only these ids (default: all poison URLs)")
+    args = parser.parse_args()
+
+    queue = WorkQueue(args.queue)
+    try:
+        if args.command == 'add':
+            from batch import read_urls
+
+            urls = read_urls(args.urls)
+            print(f"📥 Queued {queue.add(urls)} of {len(urls)} URLs ({args.queue})")
+        elif args.command == 'stats':
+            print_stats(queue.stats())
+        elif args.command == 'poison':
+            for row in queue.poison(args.limit):
+                print(f"[{row['id']}] {row['url']}  ({row['attempts']} attempts, last on {row['node'] or '-'})")
+                print(f"    {row['last_error']}")
+        elif args.command == 'retry':
+            print(f"🔁 Re-queued {queue.retry_poison(args.ids)} poison URLs")
+    except sqlite3.Error as e:
+        print(f"❌ {args.queue}: {e}")
+        sys.exit(1)
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
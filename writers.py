@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Streaming NDJSON result writer.
+
+Instead of holding every request in memory and dumping one pretty-printed
+JSON document at the end, records are appended to ``{base}.ndjson`` one per
+line as the scraper processes them. The page HTML and any response body
+larger than ``inline_body_limit`` bytes are written once to side files and
+referenced by path, so memory use does not grow with the size of the page.
+
+File layout::
+
+    {base}.ndjson        {"type": "scrape_info", ...}   first line
+                         {"type": "request", ...}       one per request
+                         {"type": "response", ...}      one per API response
+                         {"type": "summary", ...}       last line
+    {base}.html          page HTML
+    {base}_bodies/N.body response bodies too large to inline
+
+With a BlobStore, every body and the HTML go to the shared blob store
+instead and records reference them by hash (``body_blob``, ``html_blob``).
+"""
+import json
+import os
+import shutil
+
+from blobstore import BlobStore
+from bodies import serializable_body
+
+DEFAULT_INLINE_BODY_LIMIT = 64 * 1024
+
+
+class NdjsonResultWriter:
+    def __init__(self, base, scrape_info, inline_body_limit=DEFAULT_INLINE_BODY_LIMIT, blob_store=None):
+        self.base = base
+        self.path = f"{base}.ndjson"
+        self.scrape_info = scrape_info
+        self.inline_body_limit = inline_body_limit
+        self.blob_store = blob_store
+        self.bytes_written = 0
+        self._bodies = 0
+        self._file = open(self.path, 'wb')
+        self.write({'type': 'scrape_info', **scrape_info})
+
+    def write(self, record):
+        line = (json.dumps(record, ensure_ascii=False, default=dict) + "\n").encode('utf-8')
+        self._file.write(line)
+        self.bytes_written += len(line)
+
+    def write_response(self, record, body):
+        """Write an API response record, inlining small bodies and spilling large ones to a side file.
+
+        Inline bodies are kept on ``record`` as bytes; they are only decoded for the line written out.
+        """
+        if body is not None and self.blob_store:
+            record['body_blob'], written = self.blob_store.put(body)
+            record['body_size'] = len(body)
+            self.bytes_written += written
+            self.write(record)
+            # Small bodies stay in memory for previews but are not written inline
+            if len(body) <= self.inline_body_limit:
+                record['body'] = body
+            return
+        if body is not None and len(body) > self.inline_body_limit:
+            record['body_file'] = self._write_body_file(body)
+            record['body_size'] = len(body)
+        elif body is not None:
+            record['body'] = body
+        self.write(serializable_body(record))
+
+    def _write_body_file(self, body):
+        bodies_dir = f"{self.base}_bodies"
+        os.makedirs(bodies_dir, exist_ok=True)
+        self._bodies += 1
+        path = os.path.join(bodies_dir, f"{self._bodies}.body")
+        with open(path, 'wb') as f:
+            f.write(body)
+        self.bytes_written += len(body)
+        return path
+
+    def write_html(self, html):
+        """Write the page HTML; returns its path, or ``blob:{hash}`` when using a blob store"""
+        if self.blob_store:
+            digest, written = self.blob_store.put(html)
+            self.bytes_written += written
+            return f"blob:{digest}"
+        html_file = f"{self.base}.html"
+        data = html.encode('utf-8')
+        with open(html_file, 'wb') as f:
+            f.write(data)
+        self.bytes_written += len(data)
+        return html_file
+
+    def flush(self):
+        """Push buffered records to disk so readers see them before the scrape ends"""
+        if not self._file.closed:
+            self._file.flush()
+
+    def close(self, summary=None):
+        if self._file.closed:
+            return self.path
+        if summary is not None:
+            self.write({'type': 'summary', **summary})
+        self._file.close()
+        return self.path
+
+    def discard(self):
+        """Close and delete everything written so far, for a run that was cancelled or failed"""
+        self._file.close()
+        for path in (self.path, f"{self.base}.html"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        shutil.rmtree(f"{self.base}_bodies", ignore_errors=True)
+
+
+def iter_records(path, record_type=None):
+    """Yield the records of an NDJSON result file one at a time, optionally only those of one type"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if record_type is None or record.get('type') == record_type:
+                yield record
+
+
+def read_body_excerpt(record, limit, blob_store=None):
+    """Return up to ``limit`` characters of a record's body, reading side files only as far as needed"""
+    if isinstance(record.get('body'), (bytes, bytearray)):
+        return record['body'][:limit * 4].decode('utf-8', errors='replace')[:limit]
+    if record.get('body') is not None:
+        return record['body'][:limit]
+    if record.get('body_file'):
+        with open(record['body_file'], 'rb') as f:
+            return f.read(limit * 4).decode('utf-8', errors='replace')[:limit]
+    if record.get('body_blob'):
+        with (blob_store or BlobStore()).open(record['body_blob']) as f:
+            return f.read(limit * 4).decode('utf-8', errors='replace')[:limit]
+    return ''